@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of schema-generator.py: the time and the memory allocated to
+generate every document type of a model, message/model.json by default.
+
+Usage:
+  python tools/schema-generator-benchmark.py [--repeat N] [MODEL ...]
+"""
+import importlib.util
+import os
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+
+_TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_MODEL_FILE = os.path.normpath(
+    os.path.join(_TOOLS_DIR, "..", "message", "model.json")
+)
+# the peaks of the default model when the generator deep-copied its shared
+# schema fragments, to tell how much generating the documents allocates now
+_DEEP_COPY_PEAK_KIB = {"json-schema": 122, "avro-schema": 61, "openapi": 370}
+
+
+def _load_generator():
+    spec = importlib.util.spec_from_file_location(
+        "schema_generator", os.path.join(_TOOLS_DIR, "schema-generator.py")
+    )
+    generator = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(generator)
+    return generator
+
+
+def bench_generation(model_files, repeat: int) -> None:
+    generator = _load_generator()
+    model_definition = generator.merge_model_definition(model_files)
+    is_default_model = [os.path.abspath(path) for path in model_files] == [
+        _DEFAULT_MODEL_FILE
+    ]
+    for schema_type in generator.schema_types:
+
+        def generate():
+            return generator.generate_document(schema_type, model_definition)
+
+        generate()  # warm up, the openapi template is read from disk
+        tracemalloc.start()
+        generate()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        seconds = min(timeit.repeat(generate, number=1, repeat=repeat))
+        baseline = (
+            f" ({_DEEP_COPY_PEAK_KIB[schema_type]}KiB with deep copies)"
+            if is_default_model
+            else ""
+        )
+        print(
+            f"{schema_type} of {', '.join(model_files)}: "
+            f"{seconds * 1000:.2f}ms, "
+            f"peak allocated {peak_bytes / 1024:.0f}KiB{baseline}"
+        )
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "model_files",
+        nargs="*",
+        default=[_DEFAULT_MODEL_FILE],
+        metavar="MODEL",
+        help="the model definition files merged into the benchmarked model",
+    )
+    args = parser.parse_args()
+    bench_generation(args.model_files, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
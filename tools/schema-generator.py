@@ -1,13 +1,49 @@
 import argparse
-import copy
+import hashlib
 import json
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from jsonpointer import resolve_pointer
 
+class SharedFragment(dict):
+    """
+    A read-only dict, shared by all the schemas it is part of. Copy it before
+    changing it, dict(fragment) is enough to change its top level.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared schema fragments are read-only, change a copy instead")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return SharedFragment, (dict(self),)
+
+
+def freeze(value):
+    """
+    Returns the JSON value as shared fragments and tuples, which can be part of
+    many schemas at once since they cannot be changed.
+    """
+    if isinstance(value, dict):
+        return SharedFragment({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+openapi_template_file_name = os.path.join(os.path.dirname(__file__), '..', 'core', 'templates', 'xregistry_openapi_template.json')
+# any change to the generator invalidates the cached documents
+with open(__file__, 'rb') as generator_file:
+    generator_version = hashlib.sha256(generator_file.read()).hexdigest()
+schema_cache_dir_name = ".schema_cache"
+
 avro_generic_record_name = "GenericRecord"
 avro_generic_record_qualified_name = "io.xregistry.GenericRecord"
-avro_generic_record = {
+avro_generic_record = freeze({
   "type": "record",
   "name": avro_generic_record_name,
   "fields": [
@@ -43,10 +79,10 @@ avro_generic_record = {
       }
     }
   ]
-}
+})
 
 
-avro_type_mapping = {
+avro_type_mapping = freeze({
     "string": {"type": "string"},
     "object": {"type": "record"},
     "map": {"type": { "type": "map"}},
@@ -63,9 +99,9 @@ avro_type_mapping = {
     "any": {"type": avro_generic_record_qualified_name},
     "var": {"type": avro_generic_record_qualified_name},
     "xid": {"type": "string"}
-}
+})
 
-json_type_mapping = {
+json_type_mapping = freeze({
     "string": {"type": "string"},
     "object": {"type": "object"},
     "map": {"type": "object"},
@@ -82,9 +118,9 @@ json_type_mapping = {
     "timestamp": {"type": "string", "format": "date-time"},
     "any": {},
     "var": {"type": "object"}
-}
+})
 
-json_common_attributes = {
+json_common_attributes = freeze({
     "name": {"type": "string", "description": "Name of the object"},
     "epoch": {"type": "integer", "description": "Epoch time of the object creation"},
     "self": {"type": "string", "format": "uri", "description": "URL of the object"},
@@ -94,9 +130,9 @@ json_common_attributes = {
     "labels": {"type": "object", "description": "Labels for the object"},
     "createdat": {"type": "string", "format": "date-time", "description": "Time of the object creation"},
     "modifiedat": {"type": "string", "format": "date-time", "description": "Time of the object modification"}
-}
+})
 
-avro_common_attributes = [
+avro_common_attributes = freeze([
     {"name": "name", "type": ["string", "null"], "doc": "Name of the object"},
     {"name": "epoch", "type": ["int", "null"], "doc": "Epoch time of the object creation"},
     {"name": "self", "type": "string", "doc": "URL of the object"},
@@ -106,7 +142,7 @@ avro_common_attributes = [
     {"name": "labels", "type": { "type": "map", "values": ["string", "null"]} , "doc": "Labels for the object"},
     {"name": "createdat", "type": [{"type":"int", "logicalType": "time-millis"}, "null"], "doc": "Time of the object creation"},
     {"name": "modifiedat", "type": [{"type":"int", "logicalType": "time-millis"},"null"], "doc": "Time of the object modification"}
-]
+])
 
 
 def pascal(string):
@@ -133,38 +169,189 @@ def camel(string):
     return pascalString[0:1].lower() + pascalString[1:]
 
 
-def generate_openapi(model_definition):
+class Attribute:
+    """
+    An attribute of a model, or the item of an array or map attribute, with
+    the names the generators derive from it.
+    """
+    __slots__ = ("name", "pascal_name", "camel_name", "type", "description", "required", "has_default",
+                 "enum", "item", "attributes", "ifvalues")
+
+    def __init__(self, name, props):
+        self.name = name
+        self.pascal_name = pascal(name)
+        self.camel_name = camel(self.pascal_name)
+        # None for attributes without a type, skipped by the avro schema
+        self.type = props.get("type")
+        if self.type is not None and self.type not in json_type_mapping:
+            raise Exception(f"Attribute '{name}' has unknown type '{self.type}'")
+        self.description = props.get("description")
+        self.required = props.get("required") == True
+        self.has_default = "default" in props
+        self.enum = props.get("enum")
+        self.item = Attribute(name, props["item"]) if "item" in props else None
+        # None if not given, unlike an empty dict
+        self.attributes = parse_attributes(props["attributes"]) if "attributes" in props else None
+        self.ifvalues = tuple(IfValue(value, condition_props) for value, condition_props in props["ifvalues"].items()) \
+            if "ifvalues" in props else None
+
+
+class IfValue:
+    """
+    A value of an attribute with ifvalues, and the sibling attributes it brings.
+    """
+    __slots__ = ("value", "identifier", "pascal_identifier", "sibling_attributes")
+
+    def __init__(self, value, props):
+        self.value = value
+        # the value with all spaces and special characters turned into underscores
+        self.identifier = "".join([c if c.isalnum() else "_" for c in value])
+        self.pascal_identifier = pascal(self.identifier)
+        # None if not given, unlike an empty dict
+        self.sibling_attributes = parse_attributes(props["siblingattributes"]) if "siblingattributes" in props else None
+
+
+class Resource:
+    __slots__ = ("key", "singular", "plural", "pascal_singular", "pascal_plural", "camel_plural",
+                 "has_document", "max_versions", "versions", "attributes")
+
+    def __init__(self, key, props):
+        self.key = key
+        if "singular" not in props:
+            raise Exception(f"Resource '{key}' has no singular name")
+        self.singular = props["singular"]
+        self.plural = props.get("plural", key)
+        self.pascal_singular = pascal(self.singular)
+        self.pascal_plural = pascal(self.plural)
+        self.camel_plural = camel(self.plural)
+        self.has_document = props.get("hasdocument", True)
+        self.max_versions = props.get("maxversions", -1)
+        self.versions = props.get("versions", 1)
+        # None if not given, unlike an empty dict
+        self.attributes = parse_attributes(props["attributes"]) if "attributes" in props else None
+
+
+class ImportedResource:
+    """
+    A resource of another group listed in the ximportresources of a group.
+    """
+    __slots__ = ("group", "resource", "plural", "pascal_plural", "camel_plural")
+
+    def __init__(self, group, resource, plural):
+        self.group = group
+        self.resource = resource
+        # as written in the xid, the key of the resource in its group
+        self.plural = plural
+        self.pascal_plural = pascal(plural)
+        self.camel_plural = camel(plural)
+
+
+class Group:
+    __slots__ = ("key", "singular", "plural", "pascal_singular", "pascal_plural", "camel_plural",
+                 "attributes", "resources", "imported_resources")
+
+    def __init__(self, key, props):
+        self.key = key
+        if "singular" not in props:
+            raise Exception(f"Group '{key}' has no singular name")
+        self.singular = props["singular"]
+        self.plural = props.get("plural", key)
+        self.pascal_singular = pascal(self.singular)
+        self.pascal_plural = pascal(self.plural)
+        self.camel_plural = camel(self.plural)
+        # None if not given, unlike an empty dict
+        self.attributes = parse_attributes(props["attributes"]) if "attributes" in props else None
+        self.resources = {}
+        for resource_key, resource_props in props.get("resources", {}).items():
+            resource_props = resolve_resource(props, resource_props)
+            self.resources[resource_key] = Resource(resource_key, resource_props)
+        # filled in by build_registry once all the groups are known
+        self.imported_resources = ()
+
+
+class Registry:
+    """
+    A model definition parsed once and shared by all the generators, see
+    build_registry.
+    """
+    __slots__ = ("groups",)
+
+    def __init__(self, groups):
+        self.groups = groups
+
+
+def parse_attributes(attributes):
+    return {name: Attribute(name, props) for name, props in attributes.items()}
+
+
+def build_registry(model_definition):
+    """
+    Parses and validates a model definition, with its resources loaded and its
+    ximportresources resolved.
+
+    Args:
+        model_definition (dict): The model definition, with the $includes resolved.
+
+    Returns:
+        Registry: The parsed model definition.
+    """
+    groups = {key: Group(key, props) for key, props in model_definition.get("groups", {}).items()}
+    for key, props in model_definition.get("groups", {}).items():
+        imported_resources = []
+        for xid in props.get("ximportresources", []):
+            xid_parts = xid.split("/")[1:]
+            if len(xid_parts) != 2 or xid_parts[0] not in groups or xid_parts[1] not in groups[xid_parts[0]].resources:
+                raise Exception(f"Group '{key}' imports unknown resource '{xid}'")
+            group_key, resource_key = xid_parts
+            imported_resources.append(
+                ImportedResource(groups[group_key], groups[group_key].resources[resource_key], resource_key))
+        groups[key].imported_resources = tuple(imported_resources)
+    return Registry(groups)
+
+
+def as_registry(model_definition):
+    if isinstance(model_definition, Registry):
+        return model_definition
+    return build_registry(model_definition)
+
+
+def generate_openapi(model_definition, json_schema=None):
+    registry = as_registry(model_definition)
 
     # now recursively find all $ref attributes in the template and replace them with references to the appropriate schema
-    def replace_refs(schema_fragment: dict, expression: str, reference: str):
+    def replace_values(schema_fragment: dict, key: str, expression: str, reference: str) -> dict:
+        """
+        Returns the fragment with the expression replaced by the reference in the
+        values of the given key. Only the dicts and lists leading to a replaced
+        value are copied, the rest is shared with the given fragment.
+        """
+        changes = {}
         for k,v in schema_fragment.items():
-            if k == "$ref":
+            if k == key:
                 if expression in v:
-                    schema_fragment[k] = v.replace(expression, reference)
+                    changes[k] = v.replace(expression, reference)
             if isinstance(v, dict):
-                replace_refs(v, expression, reference)
+                replaced = replace_values(v, key, expression, reference)
+                if replaced is not v:
+                    changes[k] = replaced
             elif isinstance(v, list):
-                for item in v:
-                    if isinstance(item, dict):
-                        replace_refs(item, expression, reference)
+                items = [replace_values(item, key, expression, reference) if isinstance(item, dict) else item for item in v]
+                if any(item is not original for item, original in zip(items, v)):
+                    changes[k] = items
+        return {**schema_fragment, **changes} if changes else schema_fragment
 
-    def replace_ops(schema_fragment: dict, expression: str, reference: str):
-        for k,v in schema_fragment.items():
-            if k == "operationId":
-                if v.find(expression) != -1:
-                    schema_fragment[k] = v.replace(expression, reference)
-            if isinstance(v, dict):
-                replace_ops(v, expression, reference)
-            elif isinstance(v, list):
-                for item in v:
-                    if isinstance(item, dict):
-                        replace_ops(item, expression, reference)
+    def replace_refs(schema_fragment: dict, expression: str, reference: str) -> dict:
+        return replace_values(schema_fragment, "$ref", expression, reference)
+
+    def replace_ops(schema_fragment: dict, expression: str, reference: str) -> dict:
+        return replace_values(schema_fragment, "operationId", expression, reference)
 
     try:
-        template_file_name = os.path.join(os.path.dirname(__file__), '..', 'core', 'templates', 'xregistry_openapi_template.json')
+        template_file_name = openapi_template_file_name
         with open(template_file_name, encoding='utf-8') as file:
             openapi = json.load(file)
-        json_schema = generate_json_schema(model_definition, True)
+        if json_schema is None:
+            json_schema = generate_json_schema(registry, True)
         # merge JSON schema with template
         for schema_name, schema in json_schema["components"]["schemas"].items():
             openapi["components"]["schemas"][schema_name] = schema
@@ -172,157 +359,133 @@ def generate_openapi(model_definition):
 
         path = "/"
         root_template = openapi["paths"][path]
-        replace_refs(root_template, "{%-documentTypeReference-%}", f"#/components/schemas/document")
+        openapi["paths"][path] = replace_refs(root_template, "{%-documentTypeReference-%}", f"#/components/schemas/document")
 
         path = "/{%-groupNamePlural-%}"
         path_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            path_template_copy = copy.deepcopy(path_template)
-            replace_refs(path_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-            replace_ops(path_template_copy, "{%-groupNamePlural-%}", f"{pascal(group['plural'])}")
-            openapi["paths"][f"/{group['plural']}"]: path_template_copy
+        for group in registry.groups.values():
+            path_template_copy = path_template
+            path_template_copy = replace_refs(path_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+            path_template_copy = replace_ops(path_template_copy, "{%-groupNamePlural-%}", f"{group.pascal_plural}")
+            openapi["paths"][f"/{group.plural}"]: path_template_copy
         openapi["paths"].pop(path)
 
         path = "/{%-groupNamePlural-%}/{groupid}"
         group_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            group_template_copy = copy.deepcopy(group_template)
-            replace_refs(group_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-            replace_ops(group_template_copy, "{%-groupNameSingular-%}", f"{pascal(group['singular'])}")
-            openapi["paths"][f"/{group['plural']}/{{groupid}}"] = group_template_copy
+        for group in registry.groups.values():
+            group_template_copy = group_template
+            group_template_copy = replace_refs(group_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+            group_template_copy = replace_ops(group_template_copy, "{%-groupNameSingular-%}", f"{group.pascal_singular}")
+            openapi["paths"][f"/{group.plural}/{{groupid}}"] = group_template_copy
 
         openapi["paths"].pop(path)
         path = "/{%-groupNamePlural-%}/{groupid}/{%-resourceNamePlural-%}"
         resource_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            for _, resource in group.get("resources", {}).items():
-                resource = resolve_resource(group, resource)
-                resource_template_copy = copy.deepcopy(resource_template)
-                replace_refs(resource_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource['singular']}")
-                replace_refs(resource_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-                replace_ops(resource_template_copy, "{%-resourceNamePlural-%}", f"{pascal(group['singular'])}{pascal(resource['plural'])}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{resource['plural']}"]= resource_template_copy
-            for ximportresources_xid in group.get("ximportresources", []):
-                xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-                xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
-                xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-                resource_template_copy = copy.deepcopy(resource_template)
-                replace_refs(resource_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{xid_resource_singular}")
-                replace_refs(resource_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{xid_group_singular}")
-                replace_ops(resource_template_copy, "{%-resourceNamePlural-%}", f"{pascal(group['singular'])}{pascal(xid_resource_plural)}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{xid_resource_plural}"]= resource_template_copy
+        for group in registry.groups.values():
+            for resource in group.resources.values():
+                resource_template_copy = resource_template
+                resource_template_copy = replace_refs(resource_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource.singular}")
+                resource_template_copy = replace_refs(resource_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+                resource_template_copy = replace_ops(resource_template_copy, "{%-resourceNamePlural-%}", f"{group.pascal_singular}{resource.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{resource.plural}"]= resource_template_copy
+            for imported in group.imported_resources:
+                resource_template_copy = resource_template
+                resource_template_copy = replace_refs(resource_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{imported.resource.singular}")
+                resource_template_copy = replace_refs(resource_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{imported.group.singular}")
+                resource_template_copy = replace_ops(resource_template_copy, "{%-resourceNamePlural-%}", f"{group.pascal_singular}{imported.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{imported.plural}"]= resource_template_copy
 
         openapi["paths"].pop(path)
         path = "/{%-groupNamePlural-%}/{groupid}/{%-resourceNamePlural-%}/{resourceid}/meta"
         meta_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            for _, resource in group.get("resources", {}).items():
-                resource = resolve_resource(group, resource)
-                meta_template_copy = copy.deepcopy(meta_template)
-                replace_refs(meta_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource['singular']}")
-                replace_refs(meta_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-                replace_ops(meta_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(resource['singular'])}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{resource['plural']}/{{resourceid}}/meta"]= meta_template_copy
-            for ximportresources_xid in group.get("ximportresources", []):
-                xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-                xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
-                xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-                meta_template_copy = copy.deepcopy(meta_template)
-                replace_refs(meta_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{xid_resource_singular}")
-                replace_refs(meta_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{xid_group_singular}")
-                replace_ops(meta_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(xid_resource_plural)}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{xid_resource_plural}/{{resourceid}}/meta"]= meta_template_copy
+        for group in registry.groups.values():
+            for resource in group.resources.values():
+                meta_template_copy = meta_template
+                meta_template_copy = replace_refs(meta_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource.singular}")
+                meta_template_copy = replace_refs(meta_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+                meta_template_copy = replace_ops(meta_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{resource.pascal_singular}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{resource.plural}/{{resourceid}}/meta"]= meta_template_copy
+            for imported in group.imported_resources:
+                meta_template_copy = meta_template
+                meta_template_copy = replace_refs(meta_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{imported.resource.singular}")
+                meta_template_copy = replace_refs(meta_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{imported.group.singular}")
+                meta_template_copy = replace_ops(meta_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{imported.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{imported.plural}/{{resourceid}}/meta"]= meta_template_copy
 
         openapi["paths"].pop(path)
         path = "/{%-groupNamePlural-%}/{groupid}/{%-resourceNamePlural-%}/{resourceid}$details"
         details_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            for _, resource in group.get("resources", {}).items():
-                resource = resolve_resource(group, resource)
-                details_template_copy = copy.deepcopy(details_template)
-                replace_refs(details_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource['singular']}")
-                replace_refs(details_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-                replace_ops(details_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(resource['singular'])}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{resource['plural']}/{{resourceid}}$details"]= details_template_copy
-            for ximportresources_xid in group.get("ximportresources", []):
-                xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-                xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
-                xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-                details_template_copy = copy.deepcopy(details_template)
-                replace_refs(details_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{xid_resource_singular}")
-                replace_refs(details_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{xid_group_singular}")
-                replace_ops(details_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(xid_resource_plural)}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{xid_resource_plural}/{{resourceid}}$details"]= details_template_copy
+        for group in registry.groups.values():
+            for resource in group.resources.values():
+                details_template_copy = details_template
+                details_template_copy = replace_refs(details_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource.singular}")
+                details_template_copy = replace_refs(details_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+                details_template_copy = replace_ops(details_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{resource.pascal_singular}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{resource.plural}/{{resourceid}}$details"]= details_template_copy
+            for imported in group.imported_resources:
+                details_template_copy = details_template
+                details_template_copy = replace_refs(details_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{imported.resource.singular}")
+                details_template_copy = replace_refs(details_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{imported.group.singular}")
+                details_template_copy = replace_ops(details_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{imported.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{imported.plural}/{{resourceid}}$details"]= details_template_copy
 
         openapi["paths"].pop(path)
         path = "/{%-groupNamePlural-%}/{groupid}/{%-resourceNamePlural-%}/{resourceid}"
         resourceid_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            for _, resource in group.get("resources", {}).items():
-                resource = resolve_resource(group, resource)
-                resourceid_template_copy = copy.deepcopy(resourceid_template)
-                replace_refs(resourceid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource['singular']}")
-                replace_refs(resourceid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-                replace_ops(resourceid_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(resource['singular'])}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{resource['plural']}/{{resourceid}}"]= resourceid_template_copy
-            for ximportresources_xid in group.get("ximportresources", []):
-                xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-                xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
-                xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-                resourceid_template_copy = copy.deepcopy(resourceid_template)
-                replace_refs(resourceid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{xid_resource_singular}")
-                replace_refs(resourceid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{xid_group_singular}")
-                replace_ops(resourceid_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(xid_resource_plural)}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{xid_resource_plural}/{{resourceid}}"]= resourceid_template_copy
+        for group in registry.groups.values():
+            for resource in group.resources.values():
+                resourceid_template_copy = resourceid_template
+                resourceid_template_copy = replace_refs(resourceid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource.singular}")
+                resourceid_template_copy = replace_refs(resourceid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+                resourceid_template_copy = replace_ops(resourceid_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{resource.pascal_singular}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{resource.plural}/{{resourceid}}"]= resourceid_template_copy
+            for imported in group.imported_resources:
+                resourceid_template_copy = resourceid_template
+                resourceid_template_copy = replace_refs(resourceid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{imported.resource.singular}")
+                resourceid_template_copy = replace_refs(resourceid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{imported.group.singular}")
+                resourceid_template_copy = replace_ops(resourceid_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{imported.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{imported.plural}/{{resourceid}}"]= resourceid_template_copy
 
         openapi["paths"].pop(path)
         path = "/{%-groupNamePlural-%}/{groupid}/{%-resourceNamePlural-%}/{resourceid}/versions"
         versions_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            for _, resource in group.get("resources", {}).items():
-                resource = resolve_resource(group, resource)
-                versions_template_copy = copy.deepcopy(versions_template)
-                replace_refs(versions_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource['singular']}")
-                replace_refs(versions_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-                replace_ops(versions_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(resource['singular'])}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{resource['plural']}/{{resourceid}}/versions"]= versions_template_copy
-            for ximportresources_xid in group.get("ximportresources", []):
-                xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-                xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
-                xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-                versions_template_copy = copy.deepcopy(versions_template)
-                replace_refs(versions_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{xid_resource_singular}")
-                replace_refs(versions_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{xid_group_singular}")
-                replace_ops(versions_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(xid_resource_plural)}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{xid_resource_plural}/{{resourceid}}/versions"]= versions_template_copy
+        for group in registry.groups.values():
+            for resource in group.resources.values():
+                versions_template_copy = versions_template
+                versions_template_copy = replace_refs(versions_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource.singular}")
+                versions_template_copy = replace_refs(versions_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+                versions_template_copy = replace_ops(versions_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{resource.pascal_singular}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{resource.plural}/{{resourceid}}/versions"]= versions_template_copy
+            for imported in group.imported_resources:
+                versions_template_copy = versions_template
+                versions_template_copy = replace_refs(versions_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{imported.resource.singular}")
+                versions_template_copy = replace_refs(versions_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{imported.group.singular}")
+                versions_template_copy = replace_ops(versions_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{imported.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{imported.plural}/{{resourceid}}/versions"]= versions_template_copy
 
         openapi["paths"].pop(path)
         path = "/{%-groupNamePlural-%}/{groupid}/{%-resourceNamePlural-%}/{resourceid}/versions/{versionid}"
         versionid_template = openapi["paths"][path]
-        for _, group in model_definition.get("groups", {}).items():
-            for _, resource in group.get("resources", {}).items():
-                resource = resolve_resource(group, resource)
-                versionid_template_copy = copy.deepcopy(versionid_template)
-                replace_refs(versionid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource['singular']}")
-                replace_refs(versionid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group['singular']}")
-                replace_ops(versionid_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(resource['singular'])}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{resource['plural']}/{{resourceid}}/versions/{{versionid}}"]= versionid_template_copy
-            for ximportresources_xid in group.get("ximportresources", []):
-                xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-                xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
-                xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-                versionid_template_copy = copy.deepcopy(versionid_template)
-                replace_refs(versionid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{xid_resource_singular}")
-                replace_refs(versionid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{xid_group_singular}")
-                replace_ops(versionid_template_copy, "{%-resourceNameSingular-%}", f"{pascal(group['singular'])}{pascal(xid_resource_plural)}")
-                openapi["paths"][f"/{group['plural']}/{{groupid}}/{xid_resource_plural}/{{resourceid}}/versions/{{versionid}}"]= versionid_template_copy
+        for group in registry.groups.values():
+            for resource in group.resources.values():
+                versionid_template_copy = versionid_template
+                versionid_template_copy = replace_refs(versionid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{resource.singular}")
+                versionid_template_copy = replace_refs(versionid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{group.singular}")
+                versionid_template_copy = replace_ops(versionid_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{resource.pascal_singular}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{resource.plural}/{{resourceid}}/versions/{{versionid}}"]= versionid_template_copy
+            for imported in group.imported_resources:
+                versionid_template_copy = versionid_template
+                versionid_template_copy = replace_refs(versionid_template_copy, "{%-resourceTypeReference-%}", f"#/components/schemas/{imported.resource.singular}")
+                versionid_template_copy = replace_refs(versionid_template_copy, "{%-groupTypeReference-%}", f"#/components/schemas/{imported.group.singular}")
+                versionid_template_copy = replace_ops(versionid_template_copy, "{%-resourceNameSingular-%}", f"{group.pascal_singular}{imported.pascal_plural}")
+                openapi["paths"][f"/{group.plural}/{{groupid}}/{imported.plural}/{{resourceid}}/versions/{{versionid}}"]= versionid_template_copy
 
         openapi["paths"].pop(path)
 
         registry_entity_schema = openapi["components"]["schemas"]["RegistryEntity"]
-        for _, group in model_definition.get("groups", {}).items():
-            group_plural = group["plural"]
-            group_singular = group["singular"]
+        for group in registry.groups.values():
+            group_plural = group.plural
+            group_singular = group.singular
             registry_entity_schema["properties"][f"{group_plural}url"] = {
             "type": "string",
             "format": "uri",
@@ -353,7 +516,7 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
     Generate a JSON schema for the given model definition.
 
     Args:
-        model_definition (dict): The model definition to generate the schema for.
+        model_definition (dict or Registry): The model definition to generate the schema for.
         for_openapi (bool, optional): Whether the schema is being generated for OpenAPI. Defaults to False.
         schema_id (str, optional): The URI to use for the schema's $id. Defaults to ''.
 
@@ -364,82 +527,82 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
     def handle_item(resource_schema, type, item, enum_values=None):
         if type == "object":
             resource_schema["type"] = "object"
-            if "attributes" in item:
-                handle_attributes(resource_schema,  item["attributes"])
+            if item.attributes is not None:
+                handle_attributes(resource_schema,  item.attributes)
         elif type == "map":
             resource_schema["type"] = "object"
-            if "type" in item:
-                if item["type"] == "object":
+            if item.type is not None:
+                if item.type == "object":
                     attr_schema = {"type": "object", "description": "", "properties": {}}
-                    if "attributes" in item:
-                        handle_attributes(attr_schema, item["attributes"])
+                    if item.attributes is not None:
+                        handle_attributes(attr_schema, item.attributes)
                 else:
-                    attr_schema = copy.deepcopy(json_type_mapping[item["type"]])
-                if "description" in item:
-                    attr_schema["description"] = item["description"]
+                    attr_schema = dict(json_type_mapping[item.type])
+                if item.description is not None:
+                    attr_schema["description"] = item.description
                 if "description" in attr_schema and attr_schema["description"] == "":
                     del attr_schema["description"]
                 resource_schema["additionalProperties"] = attr_schema
-                if item["type"] == "object" or item["type"] == "map" or item["type"] == "array":
-                    if "item" in item:
-                        handle_item(resource_schema["additionalProperties"], item["type"], item["item"])
+                if item.type == "object" or item.type == "map" or item.type == "array":
+                    if item.item is not None:
+                        handle_item(resource_schema["additionalProperties"], item.type, item.item)
         elif type == "array":
             resource_schema["type"] = "array"
-            if "type" in item:
-                if item["type"] == "object":
+            if item.type is not None:
+                if item.type == "object":
                     attr_schema = {"type": "object", "description": "", "properties": {}}
-                    if "attributes" in item:
-                        handle_attributes(attr_schema, item["attributes"])
-                    else:
-                        attr_schema = copy.deepcopy(attr_schema)
+                    if item.attributes is not None:
+                        handle_attributes(attr_schema, item.attributes)
                 else:
-                    attr_schema = copy.deepcopy(json_type_mapping[item["type"]])
-                if "description" in item:
-                    attr_schema["description"] = item["description"]
+                    attr_schema = dict(json_type_mapping[item.type])
+                if item.description is not None:
+                    attr_schema["description"] = item.description
                 if "description" in attr_schema and attr_schema["description"] == "":
                     del attr_schema["description"]
                 # Apply enum constraint to array items if provided
                 if enum_values is not None and len(enum_values) > 0:
                     attr_schema["enum"] = enum_values
                 resource_schema["items"] = attr_schema
-                if item["type"] == "object" or item["type"] == "map" or item["type"] == "array":
-                    if "item" in item:
-                        handle_item(resource_schema["items"], item["type"], item["item"])
+                if item.type == "object" or item.type == "map" or item.type == "array":
+                    if item.item is not None:
+                        handle_item(resource_schema["items"], item.type, item.item)
 
 
 
     def handle_attributes(resource_schema, attributes):
         """
-        This function takes in a resource schema and a dictionary of attributes and their properties.
+        This function takes in a resource schema and a dictionary of attributes by name.
         It iterates through each attribute and creates a JSON schema for it based on its properties.
         The function also handles nested attributes and conditional attributes using the "ifvalues" property.
         The resulting schema is added to the resource schema.
         """
-        for attr_name, attr_props in attributes.items():
-            if attr_props["type"] == "object":
+        for attr_name, attribute in attributes.items():
+            if attribute.type is None:
+                raise Exception(f"Attribute '{attr_name}' has no type")
+            if attribute.type == "object":
                 attr_schema = {"type": "object", "description": "", "properties": {}}
-                if "attributes" in attr_props:
-                    handle_attributes(attr_schema, attr_props["attributes"])
+                if attribute.attributes is not None:
+                    handle_attributes(attr_schema, attribute.attributes)
             else:
-                attr_schema = copy.deepcopy(json_type_mapping[attr_props["type"]])
+                attr_schema = dict(json_type_mapping[attribute.type])
 
-            if "description" in attr_props:
-                attr_schema["description"] = attr_props["description"]
+            if attribute.description is not None:
+                attr_schema["description"] = attribute.description
             if "description" in attr_schema and attr_schema["description"] == "":
                 del attr_schema["description"]
 
-            if attr_props["type"] == "object" or attr_props["type"] == "map" or attr_props["type"] == "array":
-                if "item" in attr_props:
+            if attribute.type == "object" or attribute.type == "map" or attribute.type == "array":
+                if attribute.item is not None:
                     # Pass enum values if this is an array with enum constraint
-                    enum_values = attr_props.get("enum") if attr_props["type"] == "array" else None
-                    handle_item(attr_schema, attr_props["type"], attr_props["item"], enum_values)
+                    enum_values = attribute.enum if attribute.type == "array" else None
+                    handle_item(attr_schema, attribute.type, attribute.item, enum_values)
 
-            if "required" in attr_props and attr_props["required"] == True and not "default" in attr_props:
+            if attribute.required and not attribute.has_default:
                 if "required" not in resource_schema:
                     resource_schema["required"] = []
                 resource_schema["required"].append(attr_name)
 
-            if "ifvalues" in attr_props:
+            if attribute.ifvalues is not None:
                 if attr_name == "*":
                     raise Exception("Can't use wild card attribute name with ifvalues")
 
@@ -455,25 +618,26 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
                         resource_schema["required"].remove(attr_name)
 
                 one_of = []
-                for condition_value, condition_props in attr_props["ifvalues"].items():
-                    # create an identifier from condition_value, turning all spaces and special characters in to underscore
-                    condition_schema_identifier = attr_name + "_" + "".join([c if c.isalnum() else "_" for c in condition_value])
+                for if_value in attribute.ifvalues:
+                    condition_value = if_value.value
+                    condition_schema_identifier = attr_name + "_" + if_value.identifier
                     # for openapi, add a reference to this schema in the discriminator mapping
                     if for_openapi:
                         resource_schema["discriminator"]["mapping"][condition_value] = f"#/components/schemas/{condition_schema_identifier}"
 
-                    conditional_attr_schema = copy.deepcopy(attr_schema)
+                    # only the top level changes, the rest is shared with attr_schema
+                    conditional_attr_schema = dict(attr_schema)
                     conditional_attr_schema.update({
                                 "enum": [condition_value],
                             })
-                    if "siblingattributes" in condition_props:
+                    if if_value.sibling_attributes is not None:
                         conditional_schema = {
                                     "properties": {
                                         attr_name: conditional_attr_schema
                                     },
                                     "required": [attr_name]
                                 }
-                        handle_attributes(conditional_schema,  condition_props.get("siblingattributes", {}))
+                        handle_attributes(conditional_schema,  if_value.sibling_attributes)
                     else:
                         conditional_attr_schema.update({
                             "default": condition_value
@@ -486,16 +650,16 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
 
                     if for_openapi:
                         resource_schema["discriminator"]["mapping"][condition_value] = f"#/components/schemas/{condition_schema_identifier}"
-                        schema_definitions[condition_schema_identifier] = copy.deepcopy(conditional_schema)
+                        schema_definitions[condition_schema_identifier] = conditional_schema
                     else:
-                        one_of.append(copy.deepcopy(conditional_schema))
+                        one_of.append(conditional_schema)
                 if len(one_of) > 0:
                     one_of.append({
                         "anyOf": [
                             { "not": { "required": [attr_name] } },
                             {
                                 "properties": {
-                                    attr_name: { "not": { "enum": list(attr_props["ifvalues"].keys()) } }
+                                    attr_name: { "not": { "enum": [if_value.value for if_value in attribute.ifvalues] } }
                                 },
                                 "required": [attr_name]
                             }
@@ -508,20 +672,21 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
                         resource_schema["oneOf"] = one_of
             else:
                 if attr_name == "*":
-                    if attr_props["type"] == "any":
+                    if attribute.type == "any":
                         continue
                     if "additionalProperties" in resource_schema:
                         resource_schema["additionalProperties"].update(attr_schema)
                     else:
-                        resource_schema["additionalProperties"] = copy.deepcopy(attr_schema)
+                        resource_schema["additionalProperties"] = attr_schema
                 else:
                     if not "properties" in resource_schema:
                         resource_schema["properties"] = {}
-                    resource_schema["properties"][attr_name] = copy.deepcopy(attr_schema)
+                    resource_schema["properties"][attr_name] = attr_schema
 
     ## body of the core function starts here
+    registry = as_registry(model_definition)
     schema_group_names = []
-    for k in model_definition.get("groups", {}).keys():
+    for k in registry.groups.keys():
         schema_group_names.append(k.lower())
 
     if for_openapi:
@@ -550,10 +715,9 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
         schema_definitions = schema["definitions"]
 
 
-    for key, group in model_definition.get("groups", {}).items():
-        if "plural" not in group: group["plural"] = key
-        groups_name = group["plural"]
-        group_name = group["singular"]
+    for group in registry.groups.values():
+        groups_name = group.plural
+        group_name = group.singular
         # Create a namespace folder for this group's definitions
         # For OpenAPI: use flat keys without -schema suffix
         # For JSON Schema: use nested structure with -schema suffix
@@ -569,15 +733,13 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
         document_properties[groups_name] = groups_schema
         resource_collection_properties = {}
 
-        for rKey, resource in group.get("resources", {}).items():
-            if "plural" not in resource: resource["plural"] = rKey
-            resource = resolve_resource(group, resource)
-            resource_name = resource["singular"]
+        for resource in group.resources.values():
+            resource_name = resource.singular
             props = {}
             props[resource_name+"id"] = {"type": "string", "description": f"ID of the {resource_name} object"}
-            props.update(copy.deepcopy(json_common_attributes))
+            props.update(json_common_attributes)
 
-            if resource.get("hasdocument", True):
+            if resource.has_document:
                 resource_schema = {
                     "type": "object",
                     "properties": props,
@@ -619,12 +781,13 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
                     "properties": props
                 }
 
-            attributes = resource.get("attributes", {})
-            if resource.get("maxversions", -1) != 1:
-                resource_version_schema = copy.deepcopy(resource_schema)
+            attributes = resource.attributes or {}
+            if resource.max_versions != 1:
+                # only the top level and the properties change
+                resource_version_schema = dict(resource_schema)
                 props = {}
                 props["versionid"] = {"type": "string", "description": f"ID of the {resource_name} version"}
-                props.update(copy.deepcopy(resource_version_schema["properties"]))
+                props.update(resource_version_schema["properties"])
                 resource_version_schema["properties"] = props
                 handle_attributes(resource_version_schema, attributes)
 
@@ -666,17 +829,17 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
                 if f"{group_name}-schema" not in schema_definitions:
                     schema_definitions[f"{group_name}-schema"] = {}
                 schema_definitions[f"{group_name}-schema"][resource_name] = resource_schema
-            resource_collection_properties[resource["plural"]] = {
+            resource_collection_properties[resource.plural] = {
                     "type": "object",
                     "additionalProperties": {
                         "$ref": f"{group_definition_prefix}{resource_name}",
                     }
                 }
 
-        for ximportresources_xid in group.get("ximportresources", []):
-            xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-            xid_group_singular = model_definition["groups"][xid_group_plural]["singular"]
-            xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
+        for imported in group.imported_resources:
+            xid_resource_plural = imported.plural
+            xid_group_singular = imported.group.singular
+            xid_resource_singular = imported.resource.singular
             # Use the source group's namespace for imported resources
             # For OpenAPI: flat keys, for JSON Schema: nested structure
             if for_openapi:
@@ -692,13 +855,12 @@ def generate_json_schema(model_definition, for_openapi=False, schema_id='') -> d
 
         props = {}
         props[group_name+"id"] = {"type": "string", "description": f"ID of the {group_name} object"}
-        props.update(copy.deepcopy(json_common_attributes))
+        props.update(json_common_attributes)
         group_schema = {
             "type": "object",
             "properties": props
         }
-        attributes = group.get("attributes", {})
-        handle_attributes(group_schema, attributes)
+        handle_attributes(group_schema, group.attributes or {})
         for resource_collection_name, resource_collection_schema in resource_collection_properties.items():
             group_schema["properties"][resource_collection_name] = resource_collection_schema
         # For OpenAPI: flat keys, for JSON Schema: nested structure
@@ -717,45 +879,46 @@ def generate_avro_schema(model_definition) -> dict:
     Generates an Avro schema based on the given model definition.
 
     Args:
-        model_definition (dict): The model definition to generate the schema from.
+        model_definition (dict or Registry): The model definition to generate the schema from.
 
     Returns:
         dict: The generated Avro schema.
     """
 
+    registry = as_registry(model_definition)
+
     # Pre-scan to determine if GenericRecord is needed anywhere
     def needs_generic_record(attributes):
         """Check if any attribute requires GenericRecord type"""
-        for attr_name, attr_props in attributes.items():
+        for attr_name, attribute in attributes.items():
             # Check for "*" extension attributes with "any" or "var" type
-            if attr_name == "*" and attr_props.get("type") in ["any", "var", "object"]:
+            if attr_name == "*" and attribute.type in ["any", "var", "object"]:
                 return True
             # Consolidated check: If attribute is an extension ("*") with type "any", "var", or "object",
             # or if attribute is type "object" without "item" or "attributes", GenericRecord is needed.
-            if (attr_name == "*" and attr_props.get("type") in ["any", "var", "object"]) or \
-               (attr_props.get("type") == "object" and "item" not in attr_props and "attributes" not in attr_props):
+            if (attr_name == "*" and attribute.type in ["any", "var", "object"]) or \
+               (attribute.type == "object" and attribute.item is None and attribute.attributes is None):
                 return True
             # Check nested attributes
-            if "attributes" in attr_props:
-                if needs_generic_record(attr_props["attributes"]):
+            if attribute.attributes is not None:
+                if needs_generic_record(attribute.attributes):
                     return True
             # Check ifvalues sibling attributes
-            if "ifvalues" in attr_props:
-                for condition_props in attr_props["ifvalues"].values():
-                    if "siblingattributes" in condition_props:
-                        if needs_generic_record(condition_props["siblingattributes"]):
+            if attribute.ifvalues is not None:
+                for if_value in attribute.ifvalues:
+                    if if_value.sibling_attributes is not None:
+                        if needs_generic_record(if_value.sibling_attributes):
                             return True
         return False
 
     # Check if GenericRecord is needed in the entire model
     generic_record_needed = False
-    for _, group in model_definition.get("groups", {}).items():
-        if "attributes" in group and needs_generic_record(group["attributes"]):
+    for group in registry.groups.values():
+        if group.attributes is not None and needs_generic_record(group.attributes):
             generic_record_needed = True
             break
-        for _, resource in group.get("resources", {}).items():
-            resource = resolve_resource(group, resource)
-            if "attributes" in resource and needs_generic_record(resource["attributes"]):
+        for resource in group.resources.values():
+            if resource.attributes is not None and needs_generic_record(resource.attributes):
                 generic_record_needed = True
                 break
         if generic_record_needed:
@@ -766,30 +929,30 @@ def generate_avro_schema(model_definition) -> dict:
 
     def handle_item(resource_schema, type, item, name, prefix, enum_values=None):
         if type == "object":
-            if "attributes" in item:
+            if item.attributes is not None:
                 item_schema = { "type": "record", "name" : prefix+name+"Type", "fields": []}
-                handle_attributes(item_schema, item["attributes"], prefix)
+                handle_attributes(item_schema, item.attributes, prefix)
                 resource_schema["type"] = item_schema
             else:
                 # Use GenericRecord reference (it's defined at document level if needed)
                 resource_schema["type"] = avro_generic_record_qualified_name
         elif type == "map":
             resource_schema["type"] =  { "type": "map", "name": prefix+name+"Type","values": "" }
-            if "type" in item:
-                item_schema = copy.deepcopy(avro_type_mapping[item["type"]])
-                if item["type"] == "object" or item["type"] == "map" or item["type"] == "array":
-                    if "item" in item:
-                        handle_item(item_schema, item["type"], item["item"], name+"Item", prefix)
+            if item.type is not None:
+                item_schema = dict(avro_type_mapping[item.type])
+                if item.type == "object" or item.type == "map" or item.type == "array":
+                    if item.item is not None:
+                        handle_item(item_schema, item.type, item.item, name+"Item", prefix)
                 resource_schema["type"]["values"] = item_schema["type"]
             else:
                 raise Exception("Map item must have a type specified")
         elif type == "array":
             resource_schema["type"] = { "type": "array", "name": prefix+name+"ArrayType", "items": "" }
-            if "type" in item:
-                item_schema = copy.deepcopy(avro_type_mapping[item["type"]])
-                if item["type"] == "object" or item["type"] == "map" or item["type"] == "array":
-                    if "item" in item:
-                        handle_item(item_schema, item["type"], item["item"], name, prefix)
+            if item.type is not None:
+                item_schema = dict(avro_type_mapping[item.type])
+                if item.type == "object" or item.type == "map" or item.type == "array":
+                    if item.item is not None:
+                        handle_item(item_schema, item.type, item.item, name, prefix)
                         resource_schema["type"]["items"] = item_schema["type"]
                 else:
                     # Apply enum constraint to array items if provided
@@ -806,18 +969,18 @@ def generate_avro_schema(model_definition) -> dict:
 
     def handle_attributes(resource_schema, attributes, type_prefix=""):
         nonlocal avro_generic_record_emitted
-        for attr_name, attr_props in attributes.items():
-            pascal_attr_name = pascal(attr_name)
+        for attr_name, attribute in attributes.items():
+            pascal_attr_name = attribute.pascal_name
             # attribute schema is based on the type mapping
-            if "type" in attr_props:
-                attr_schema = copy.deepcopy(avro_type_mapping[attr_props["type"]])
+            if attribute.type is not None:
+                attr_schema = dict(avro_type_mapping[attribute.type])
             else:
                 # If 'type' is missing, skip this attribute or handle as needed
                 continue
             # Only add a "name" field for types that are actual inline record definitions.
             # If attr_schema["type"] is a dict and has "type" == "record", it's an inline record definition.
             # Do not add "name" for simple types or references like "any"/"var".
-            if attr_name != "*" and attr_props["type"] not in ["any", "var"]:
+            if attr_name != "*" and attribute.type not in ["any", "var"]:
                 if isinstance(attr_schema.get("type"), dict) and attr_schema["type"].get("type") == "record":
                     attr_schema["name"] = type_prefix+pascal_attr_name+"Type"
                 if isinstance(attr_schema.get("type"), dict) or attr_schema.get("type") == "record":
@@ -826,22 +989,22 @@ def generate_avro_schema(model_definition) -> dict:
                     attr_schema["name"] = type_prefix+pascal_attr_name+"Type"
 
             # add the description, if any, as a doc attribute
-            if "description" in attr_props:
-                attr_schema["doc"] = attr_props["description"]
+            if attribute.description is not None:
+                attr_schema["doc"] = attribute.description
 
-            if attr_props["type"] == "object" or attr_props["type"] == "map" or attr_props["type"] == "array":
-                if "item" in attr_props:
+            if attribute.type == "object" or attribute.type == "map" or attribute.type == "array":
+                if attribute.item is not None:
                     # Pass enum values if this is an array with enum constraint
-                    enum_values = attr_props.get("enum") if attr_props["type"] == "array" else None
-                    handle_item(attr_schema, attr_props["type"], attr_props["item"], pascal_attr_name, type_prefix, enum_values)
+                    enum_values = attribute.enum if attribute.type == "array" else None
+                    handle_item(attr_schema, attribute.type, attribute.item, pascal_attr_name, type_prefix, enum_values)
                 else:
-                    if attr_props["type"] == "object":
+                    if attribute.type == "object":
                         # Use GenericRecord reference (it's defined at document level if needed)
                         attr_schema["type"] = avro_generic_record_qualified_name
                     else:
                         raise Exception("array or map attribute must have an item specified")
 
-            if "ifvalues" in attr_props:
+            if attribute.ifvalues is not None:
                 if attr_name == "*":
                     raise Exception("Can't use wild card attribute name with ifvalues")
 
@@ -849,24 +1012,23 @@ def generate_avro_schema(model_definition) -> dict:
                     resource_schema["fields"].pop(pascal_attr_name)
 
                 union = []
-                for condition_value, condition_props in attr_props["ifvalues"].items():
-                    # create an identifier from condition_value, turning all spaces and special characters in to underscore
-                    condition_schema_identifier = pascal_attr_name + pascal("".join([c if c.isalnum() else "_" for c in condition_value]))
+                for if_value in attribute.ifvalues:
+                    condition_schema_identifier = pascal_attr_name + if_value.pascal_identifier
                     conditional_schema = {
                                 "type": "record",
                                 "namespace": group_namespace,
                                 "name": type_prefix+condition_schema_identifier+"Type",
                                 "fields": []
                             }
-                    handle_attributes(conditional_schema,  condition_props.get("siblingattributes", {}), condition_schema_identifier)
+                    handle_attributes(conditional_schema,  if_value.sibling_attributes or {}, condition_schema_identifier)
                     union.append(conditional_schema)
                 if len(union) > 0:
                     field_schema = {
-                            "name": camel(pascal_attr_name),
+                            "name": attribute.camel_name,
                              "type":  union
                     }
-                    if "description" in attr_props:
-                        field_schema["doc"] = attr_props["description"]
+                    if attribute.description is not None:
+                        field_schema["doc"] = attribute.description
                     resource_schema["fields"].append(field_schema)
             else:
                 if attr_name == "*":
@@ -897,11 +1059,11 @@ def generate_avro_schema(model_definition) -> dict:
                                "default": {},
                                "values": values_type_ref
                              }}
-                    if "description" in attr_props:
-                        field_schema["doc"] = attr_props["description"]
+                    if attribute.description is not None:
+                        field_schema["doc"] = attribute.description
                     resource_schema["fields"].append(field_schema)
                 else:
-                    attr_schema["name"] = camel(pascal_attr_name)
+                    attr_schema["name"] = attribute.camel_name
                     # if the attribute is not required, union the type with null
                     #if not "required" in attr_props or attr_props["required"] == False:
                     #    attr_schema = ["null", attr_schema]
@@ -970,42 +1132,40 @@ def generate_avro_schema(model_definition) -> dict:
         }
         document_properties.append(generic_record_field)
 
-    for key, group in model_definition.get("groups", {}).items():
-        if "plural" not in group: group["plural"] = key
-        groups_name = group["plural"]
-        group_name = group["singular"]
+    for group in registry.groups.values():
+        groups_name = group.plural
+        group_name = group.singular
         # Create a namespace for this group to avoid type name collisions
         group_namespace = f"io.xregistry.{groups_name}"
         resource_collection_fields = []
 
-        for rKey, resource in group.get("resources", {}).items():
-            if "plural" not in resource: resource["plural"] = rKey
-            resource = resolve_resource(group, resource)
-            resource_name = resource["singular"]
+        for resource in group.resources.values():
+            resource_name = resource.singular
             if resource_name in record_types:
                 resource_collection_fields.append({
-                    "name": camel(resource["plural"]),
+                    "name": resource.camel_plural,
                     "type" :{
                         "type": "map",
-                        "values": f"{group_namespace}.{pascal(resource_name)}Type"
+                        "values": f"{group_namespace}.{resource.pascal_singular}Type"
                     }
                     })
             else:
                 record_types.add(resource_name)
-                props = copy.deepcopy(avro_common_attributes)
+                props = list(avro_common_attributes)
                 props.insert(0, {"name": resource_name+"id", "type": "string", "description": f"ID of the {resource_name} object"})
                 resource_schema = {
                     "type": "record",
-                    "name": pascal(resource_name)+"Type",
+                    "name": resource.pascal_singular+"Type",
                     "namespace": group_namespace,
                     "fields": props
                 }
-                attributes = resource.get("attributes", {})
-                if resource.get("versions", 1) != 1:
-                    resource_version_schema = copy.deepcopy(resource_schema)
+                attributes = resource.attributes or {}
+                if resource.versions != 1:
+                    # only the top level and the fields change
+                    resource_version_schema = dict(resource_schema, fields=list(resource_schema["fields"]))
                     resource_version_schema["fields"].insert(0, {"name" : "versionid", "type": "string", "description": f"ID of the {resource_name} version"})
                     handle_attributes(resource_version_schema, attributes)
-                    resource_version_schema["name"] = pascal(resource_name)+"VersionType"
+                    resource_version_schema["name"] = resource.pascal_singular+"VersionType"
                     resource_schema["fields"].append(
                         {
                             "name": "versions",
@@ -1016,7 +1176,7 @@ def generate_avro_schema(model_definition) -> dict:
                                 },
                                 {
                                     "type": "record",
-                                    "name": pascal(resource_name)+"VersionInfo",
+                                    "name": resource.pascal_singular+"VersionInfo",
                                     "fields": [
                                         {
                                             "name": "versionsUrl",
@@ -1034,38 +1194,35 @@ def generate_avro_schema(model_definition) -> dict:
                     handle_attributes(resource_schema, attributes)
 
                 resource_collection_fields.append({
-                    "name": camel(resource["plural"]),
+                    "name": resource.camel_plural,
                     "type" :{
                         "type": "map",
                         "values": resource_schema
                     }
                 })
 
-        for ximportresources_xid in group.get("ximportresources", []):
-            xid_group_plural, xid_resource_plural = ximportresources_xid.split("/")[1:]
-            xid_resource_singular = model_definition["groups"][xid_group_plural]["resources"][xid_resource_plural]["singular"]
+        for imported in group.imported_resources:
             # Use the source group's namespace for imported resources
-            xid_group_namespace = f"io.xregistry.{xid_group_plural}"
+            xid_group_namespace = f"io.xregistry.{imported.group.key}"
             resource_collection_fields.append({
-                    "name": camel(xid_resource_plural),
+                    "name": imported.camel_plural,
                     "type" :{
                         "type": "map",
-                        "values": f"{xid_group_namespace}.{pascal(xid_resource_singular)}Type"
+                        "values": f"{xid_group_namespace}.{imported.resource.pascal_singular}Type"
                     }
                     })
-        props = copy.deepcopy(avro_common_attributes)
+        props = list(avro_common_attributes)
         props.insert(0, {"name" : group_name+"id", "type": "string", "description": f"ID of the {group_name} object"})
         group_schema = {
             "type": "record",
-            "name": pascal(group_name)+"Type",
+            "name": group.pascal_singular+"Type",
             "fields": props,
         }
-        attributes = group.get("attributes", {})
-        handle_attributes(group_schema, attributes)
+        handle_attributes(group_schema, group.attributes or {})
         for resource_collection in resource_collection_fields:
             group_schema["fields"].append(resource_collection)
         groups_schema = {
-            "name": camel(groups_name),
+            "name": group.camel_plural,
             "type": {
                 "type": "map",
                 "values": group_schema
@@ -1117,11 +1274,12 @@ model_definition = {
 }
 
 
-def resolve_imports(basedir, node):
+def resolve_imports(basedir, node, included_files=None):
     """
     recursively resolve all $includes in the model definition.
     This code handles two cases. The legacy case where the $include is
     relative file path (URL)
+    The path of every included file is appended to included_files, if given.
     """
 
     if isinstance(node, dict):
@@ -1135,6 +1293,8 @@ def resolve_imports(basedir, node):
                 obj_ref = fr[1]
             file_ref = file_ref.replace('/', os.sep)
             import_file = os.path.join(basedir, file_ref)
+            if included_files is not None:
+                included_files.append(import_file)
             with open(import_file, encoding='utf-8') as file:
                 import_definition = json.load(file)
             del node["$include"]
@@ -1143,60 +1303,306 @@ def resolve_imports(basedir, node):
             else:
                 node.update(import_definition)
         for k,v in node.items():
-            node[k] = resolve_imports(basedir, v)
+            node[k] = resolve_imports(basedir, v, included_files)
     elif isinstance(node, list):
         for i, item in enumerate(node):
-            node[i] = resolve_imports(basedir, item)
+            node[i] = resolve_imports(basedir, item, included_files)
     return node
 
 
+schema_types = ['json-schema', 'avro-schema', 'openapi']
+
+
+def load_input_definition(input_file, included_files=None):
+    """
+    Reads a model definition file and resolves its $includes, appending the
+    path of every included file to included_files, if given.
+    """
+    with open(input_file, encoding='utf-8') as file:
+        input_definition = json.load(file)
+    return resolve_imports(os.path.dirname(input_file), input_definition, included_files)
+
+
+def merge_model_definition(input_files, load=load_input_definition):
+    """
+    Merges the groups of the given model definition files, the first
+    definition of a group wins.
+
+    Args:
+        input_files (list): The paths of the model definition files.
+        load (function, optional): Reads one model definition file. Defaults to load_input_definition.
+
+    Returns:
+        dict: The merged model definition.
+    """
+    model_definition = { "groups": {} }
+    for input_file in input_files:
+        input_definition = load(input_file)
+        if "groups" in input_definition:
+            for group_name, group_definition in input_definition["groups"].items():
+                # convert file.name to using OS separators
+                file_name = input_file.replace('/', os.sep)
+                group_definition["$source"] = os.path.join(os.getcwd(),file_name)
+                if group_name not in model_definition["groups"]:
+                    model_definition["groups"][group_name] = group_definition
+    return model_definition
+
+
+def generate_document(schema_type, model_definition, schema_id='', json_schemas=None):
+    """
+    Generates the document of the given type for the given model definition.
+
+    Args:
+        schema_type (str): One of schema_types.
+        model_definition (dict or Registry): The model definition to generate the document for.
+        schema_id (str, optional): The URI to use for the $id of a JSON schema. Defaults to ''.
+        json_schemas (dict, optional): The JSON schemas already generated for this model
+            definition, keyed by (for_openapi, schema_id), reused and filled in. Defaults to None.
+
+    Returns:
+        dict: The generated document.
+    """
+    if json_schemas is None:
+        json_schemas = {}
+    registry = as_registry(model_definition)
+    if schema_type == 'json-schema':
+        key = (False, schema_id)
+        if key not in json_schemas:
+            json_schemas[key] = generate_json_schema(registry, schema_id=schema_id)
+        return json_schemas[key]
+    elif schema_type == 'avro-schema':
+        return generate_avro_schema(registry)
+    elif schema_type == 'openapi':
+        key = (True, '')
+        if key not in json_schemas:
+            json_schemas[key] = generate_json_schema(registry, True)
+        return generate_openapi(registry, json_schemas[key])
+    raise Exception(f"Unknown document type '{schema_type}', expected one of {schema_types}")
+
+
+def serialize_document(document):
+    return json.dumps(document, indent=2)
+
+
+def write_document(document, output):
+    """
+    Writes the document to the output file, unless the file already holds it,
+    so its mtime only changes with its content, or prints it without output.
+    """
+    text = serialize_document(document)
+    if not output:
+        print(text)
+        return
+    if os.path.exists(output):
+        with open(output, encoding='utf-8') as file:
+            if file.read() == text:
+                return
+    with open(output, 'w', encoding='utf-8') as of:
+        of.write(text)
+
+
+def file_hash(path):
+    """
+    Returns the sha256 of the content of the file, None if there is no such file.
+    """
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def resource_files(model_definition):
+    """
+    Returns the paths of the files the resources of the model definition are
+    loaded from by resolve_resource, None if any is loaded from the web.
+    """
+    paths = []
+    for _, group in model_definition.get("groups", {}).items():
+        for _, resource in group.get("resources", {}).items():
+            if "uri" not in resource:
+                continue
+            file_uri = resource["uri"].split("#", 1)[0]
+            if file_uri.lower().startswith('http'):
+                return None
+            paths.append(os.path.join(os.path.dirname(group["$source"]), file_uri.replace('/', os.sep)))
+    return paths
+
+
+def load_schema_cache(cache_file):
+    if cache_file is None or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, encoding='utf-8') as file:
+            return json.load(file)
+    except ValueError:
+        return {}  # a corrupt cache is rebuilt
+
+
+def save_schema_cache(cache_file, cache):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+
+
+def is_cached_document(entry, job_key, output, hash_of=file_hash):
+    """
+    Tells whether the cached entry of a job is still valid: generated for the
+    same job by the same generator, from files that did not change since, into
+    an output that was not touched since.
+    """
+    if entry is None or any(entry.get(k) != v for k, v in job_key.items()):
+        return False
+    if any(hash_of(path) != digest for path, digest in entry["dependencies"].items()):
+        return False
+    return file_hash(output) == entry["output"]
+
+
+# the model definitions read by this process, shared by the jobs it runs:
+# input file -> (input definition, included files)
+loaded_input_definitions = {}
+# input files -> (merged model definition, its Registry, JSON schemas generated from it)
+merged_model_definitions = {}
+
+
+def load_shared_input_definition(input_file):
+    if input_file not in loaded_input_definitions:
+        included_files = []
+        input_definition = load_input_definition(input_file, included_files)
+        loaded_input_definitions[input_file] = (input_definition, included_files)
+    return loaded_input_definitions[input_file][0]
+
+
+def generate_job(input_files, schema_type, schema_id, output):
+    """
+    Generates the document of a manifest job into its output, reusing the
+    model definitions read by the earlier jobs of this process. Runs in a
+    worker process with --jobs.
+
+    Returns:
+        tuple: The paths of the files the document depends on, None if some are on
+            the web, and the seconds the job took.
+    """
+    start = time.perf_counter()
+    if input_files not in merged_model_definitions:
+        model_definition = merge_model_definition(input_files, load_shared_input_definition)
+        merged_model_definitions[input_files] = (model_definition, build_registry(model_definition), {})
+    model_definition, registry, json_schemas = merged_model_definitions[input_files]
+    write_document(generate_document(schema_type, registry, schema_id, json_schemas), output)
+
+    dependencies = resource_files(model_definition)
+    if dependencies is not None:
+        for input_file in input_files:
+            included_files = loaded_input_definitions[input_file][1]
+            dependencies += [input_file] + [os.path.normpath(path) for path in included_files]
+        if schema_type == 'openapi':
+            dependencies.append(os.path.normpath(openapi_template_file_name))
+    return dependencies, time.perf_counter() - start
+
+
+def run_manifest(manifest_file, use_cache=True, max_workers=1):
+    """
+    Generates every document listed in a manifest, a JSON array of jobs like
+    {"inputs": ["model.json"], "type": "json-schema", "schema-id": "...", "output": "schema.json"}
+    with paths relative to the manifest. Every model definition file is read
+    and resolved once per process, and every merged model definition is
+    generated from once per JSON schema, whatever the number of jobs using them.
+
+    Unless use_cache is False, the jobs whose inputs ($included files and the
+    OpenAPI template too) and generator did not change since their output was
+    generated are skipped, see is_cached_document. The cache is kept in the
+    .schema_cache directory next to the manifest.
+
+    With more than one worker, the jobs are run by a pool of processes. They are
+    reported in the order of the manifest either way.
+    """
+    with open(manifest_file, encoding='utf-8') as file:
+        jobs = json.load(file)
+    base_dir = os.path.dirname(manifest_file)
+    cache_file = os.path.join(base_dir, schema_cache_dir_name, os.path.basename(manifest_file)) if use_cache else None
+    cache = load_schema_cache(cache_file)
+    file_hashes = {}
+
+    def hash_of(path):
+        # the inputs are not written by the run, unlike the outputs
+        if path not in file_hashes:
+            file_hashes[path] = file_hash(path)
+        return file_hashes[path]
+
+    start = time.perf_counter()
+    pending_jobs = []
+    for job in jobs:
+        input_files = tuple(os.path.normpath(os.path.join(base_dir, input_file)) for input_file in job["inputs"])
+        schema_type = job.get("type", "json-schema")
+        output = os.path.normpath(os.path.join(base_dir, job["output"]))
+        job_key = {
+            "inputs": list(input_files),
+            "type": schema_type,
+            "schema-id": job.get("schema-id", ""),
+            "generator": generator_version,
+        }
+        if use_cache and is_cached_document(cache.get(output), job_key, output, hash_of):
+            print(f"> {output} is up to date")
+        else:
+            pending_jobs.append((job_key, output))
+
+    def job_args(job_key, output):
+        return tuple(job_key["inputs"]), job_key["type"], job_key["schema-id"], output
+
+    if max_workers > 1 and len(pending_jobs) > 1:
+        with ProcessPoolExecutor(min(max_workers, len(pending_jobs))) as executor:
+            futures = [executor.submit(generate_job, *job_args(*pending_job)) for pending_job in pending_jobs]
+            results = [future.result() for future in futures]
+    else:
+        results = [generate_job(*job_args(*pending_job)) for pending_job in pending_jobs]
+
+    for (job_key, output), (dependencies, seconds) in zip(pending_jobs, results):
+        print(f"> {' '.join(job_key['inputs'])} as '{job_key['type']}' to {output} ({seconds:.2f}s)")
+        if dependencies is None:
+            cache.pop(output, None)  # the web is not hashed, always generated
+            continue
+        cache[output] = {
+            **job_key,
+            "dependencies": {path: hash_of(path) for path in sorted(set(dependencies))},
+            "output": file_hash(output),
+        }
+    if pending_jobs:
+        print(f"Generated {len(pending_jobs)} of {len(jobs)} documents in {time.perf_counter() - start:.2f}s")
+    if use_cache:
+        save_schema_cache(cache_file, cache)
+
+
 # read model definition from file ../schema/model.json
 # make the path relative to this script file, irrespective of working directory
 
 def main():
     parser = argparse.ArgumentParser(description='Generate JSON schema from model definition')
-    parser.add_argument('--type', type=str, help='type of document to generate', choices=['json-schema', 'avro-schema', 'openapi'], default='json-schema')
+    parser.add_argument('--type', type=str, help='type of document to generate', choices=schema_types, default='json-schema')
     parser.add_argument('--output', type=str, help='Path for output file', default='', required=False)
     parser.add_argument('--schema-id', type=str, help='URI for the $id field in the schema', default='', required=False)
-    parser.add_argument('input_files', type=str, help='Path to input files', nargs='+')
+    parser.add_argument('--manifest', type=str, help='Path to a JSON list of jobs (inputs, type, schema-id, output) to run at once, instead of the input files', default='', required=False)
+    parser.add_argument('--no-cache', action='store_true', help='with --manifest, generate every document even if its inputs did not change')
+    parser.add_argument('--jobs', type=int, help='with --manifest, number of processes generating the documents', default=1, required=False)
+    parser.add_argument('input_files', type=str, help='Path to input files', nargs='*')
 
     args = parser.parse_args()
 
-    json_schema = None
-    model_definition = { "groups": {} }
-    for input_file in args.input_files:
-        with open(input_file, encoding='utf-8') as file:
-            print(f"> {input_file} as '{args.type}'")
-            input_definition = json.load(file)
-            input_definition = resolve_imports(os.path.dirname(input_file), input_definition)
-            if "groups" in input_definition:
-                for group_name, group_definition in input_definition["groups"].items():
-                    # convert file.name to using OS separators
-                    file_name = file.name.replace('/', os.sep)
-                    group_definition["$source"] = os.path.join(os.getcwd(),file_name)
-                    if group_name not in model_definition["groups"]:
-                        model_definition["groups"][group_name] = group_definition
-    if (args.type == 'json-schema'):
-        json_schema = generate_json_schema(model_definition, schema_id=args.schema_id)
-        if args.output:
-            with open(args.output, 'w', encoding='utf-8') as of:
-                json.dump(json_schema, of, indent=2)
-        else:
-            print(json.dumps(json_schema, indent=2))
-    elif (args.type == 'avro-schema'):
-        avro_schema = generate_avro_schema(model_definition)
-        if args.output:
-            with open(args.output, 'w') as of:
-                json.dump(avro_schema, of, indent=2)
-        else:
-            print(json.dumps(avro_schema, indent=2))
-    elif (args.type == 'openapi'):
-        openapi = generate_openapi(model_definition)
-        if args.output:
-            with open(args.output, 'w') as of:
-                json.dump(openapi, of, indent=2)
-        else:
-            print(json.dumps(openapi, indent=2))
+    if args.manifest:
+        if args.input_files:
+            parser.error("input files cannot be given with --manifest")
+        run_manifest(args.manifest, use_cache=not args.no_cache, max_workers=args.jobs)
+        return
+    if args.jobs != 1:
+        parser.error("--jobs requires --manifest")
+    if not args.input_files:
+        parser.error("the input files or --manifest are required")
+
+    def load(input_file):
+        print(f"> {input_file} as '{args.type}'")
+        return load_input_definition(input_file)
+
+    model_definition = merge_model_definition(args.input_files, load)
+    write_document(generate_document(args.type, model_definition, args.schema_id), args.output)
 
 
 if __name__ == '__main__':
@@ -428,6 +428,135 @@ class TestSchemaGenerator:
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
 
+    def test_manifest_matches_single_runs(self, endpoint_model, message_model, schema_model, tools_dir, tmp_path):
+        """Test that a --manifest run writes the same documents as one run per document."""
+        multi_model = [str(endpoint_model), str(message_model), str(schema_model)]
+        jobs = [
+            {"inputs": [str(message_model)], "type": "json-schema", "schema-id": "https://example.com/message.json",
+             "output": "message.json"},
+            {"inputs": [str(message_model)], "type": "openapi", "output": "message-openapi.json"},
+            {"inputs": multi_model, "type": "avro-schema", "output": "cloudevents.avsc"},
+            {"inputs": multi_model, "type": "openapi", "output": "cloudevents-openapi.json"},
+        ]
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(json.dumps(jobs), encoding='utf-8')
+
+        result = subprocess.run(
+            ['python', 'schema-generator.py', '--manifest', str(manifest_path)],
+            cwd=str(tools_dir),
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        assert result.returncode == 0, f"Schema generation failed: {result.stderr}"
+
+        for job in jobs:
+            single_run_args = ['--type', job["type"], '--output', str(tmp_path / "single.json")] + job["inputs"]
+            if "schema-id" in job:
+                single_run_args += ['--schema-id', job["schema-id"]]
+            result = subprocess.run(
+                ['python', 'schema-generator.py'] + single_run_args,
+                cwd=str(tools_dir),
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+            assert result.returncode == 0, f"Schema generation failed: {result.stderr}"
+            assert (tmp_path / job["output"]).read_bytes() == (tmp_path / "single.json").read_bytes(), \
+                f"{job['output']} differs from the output of a single run"
+
+    def test_manifest_skips_documents_whose_inputs_did_not_change(self, message_model, tools_dir, tmp_path):
+        """Test that a --manifest run only generates the documents whose inputs changed since the last run."""
+        model_path = tmp_path / "model.json"
+        model_path.write_bytes(message_model.read_bytes())
+        jobs = [
+            {"inputs": ["model.json"], "type": "json-schema", "output": "schema.json"},
+            {"inputs": ["model.json"], "type": "openapi", "output": "openapi.json"},
+        ]
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(json.dumps(jobs), encoding='utf-8')
+
+        def run_manifest(*args):
+            result = subprocess.run(
+                ['python', 'schema-generator.py', '--manifest', str(manifest_path), *args],
+                cwd=str(tools_dir),
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+            assert result.returncode == 0, f"Schema generation failed: {result.stderr}"
+            return result.stdout
+
+        run_manifest()
+        assert (tmp_path / ".schema_cache" / "manifest.json").exists()
+        mtimes = {job["output"]: (tmp_path / job["output"]).stat().st_mtime_ns for job in jobs}
+
+        assert run_manifest().count("is up to date") == 2
+
+        # regenerated, but rewritten only if the document changed
+        assert "is up to date" not in run_manifest('--no-cache')
+        assert mtimes == {job["output"]: (tmp_path / job["output"]).stat().st_mtime_ns for job in jobs}
+
+        model = json.loads(model_path.read_text(encoding='utf-8'))
+        model["groups"]["messagegroups"]["description"] = "changed"
+        model_path.write_text(json.dumps(model), encoding='utf-8')
+        assert "is up to date" not in run_manifest()
+
+        (tmp_path / "openapi.json").write_text("{}", encoding='utf-8')
+        output = run_manifest()
+        assert "schema.json is up to date" in output
+        assert "openapi.json is up to date" not in output
+        assert json.loads((tmp_path / "openapi.json").read_text(encoding='utf-8')) != {}
+
+    def test_manifest_jobs_in_parallel(self, endpoint_model, message_model, schema_model, tools_dir, tmp_path):
+        """Test that --jobs writes the same documents as a sequential run, reported in the order of the manifest."""
+        models = {"endpoint": endpoint_model, "message": message_model, "schema": schema_model}
+        jobs = [
+            {"inputs": [str(model_path)], "type": schema_type, "output": f"{name}-{schema_type}.json"}
+            for name, model_path in models.items()
+            for schema_type in ["json-schema", "avro-schema", "openapi"]
+        ]
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(json.dumps(jobs), encoding='utf-8')
+
+        outputs = {}
+        for job_count in ["1", "3"]:
+            result = subprocess.run(
+                ['python', 'schema-generator.py', '--manifest', str(manifest_path), '--no-cache', '--jobs', job_count],
+                cwd=str(tools_dir),
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            assert result.returncode == 0, f"Schema generation failed: {result.stderr}"
+            reported_outputs = [line.split(" to ")[1].split(" (")[0] for line in result.stdout.splitlines() if " to " in line]
+            assert reported_outputs == [str(tmp_path / job["output"]) for job in jobs]
+            outputs[job_count] = {job["output"]: (tmp_path / job["output"]).read_bytes() for job in jobs}
+            for job in jobs:
+                (tmp_path / job["output"]).unlink()
+        assert outputs["1"] == outputs["3"]
+
+    @pytest.mark.parametrize("schema_type", ['json-schema', 'avro-schema', 'openapi'])
+    def test_invalid_model_is_rejected_before_generation(self, schema_type, tools_dir, tmp_path):
+        """Test that every backend rejects a model importing a resource that does not exist."""
+        model_path = tmp_path / "model.json"
+        model_path.write_text(json.dumps({
+            "groups": {
+                "widgetgroups": {"singular": "widgetgroup", "ximportresources": ["/othergroups/gadgets"]}
+            }
+        }), encoding='utf-8')
+
+        result = subprocess.run(
+            ['python', 'schema-generator.py', '--type', schema_type, str(model_path)],
+            cwd=str(tools_dir),
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+
+        assert result.returncode != 0
+        assert "Group 'widgetgroups' imports unknown resource '/othergroups/gadgets'" in result.stderr
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -1,8 +1,21 @@
+import asyncio
+import json
+import pickle
+import re
+import subprocess
+import sys
+import time
+from argparse import ArgumentTypeError
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from pathlib import Path, PurePosixPath
 from re import Match
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import pytest
+from aiohttp import web
+
+import verify
 from verify import (
     _BANNED_PHRASES_PATTERN,
     _CAPITAL_DASH_PATTERN,
@@ -10,11 +23,57 @@ from verify import (
     _MARKDOWN_BOOKMARK_PATTERN,
     _PHRASES_THAT_MUST_BE_CAPITALIZED_PATTERN,
     _SKIP_TEXT_PATTERN,
+    CachedFileResult,
+    CachedProbe,
+    HttpUri,
+    Issue,
+    JsonLinesIssueWriter,
+    MemoryBoundedCache,
+    ProbeScheduler,
+    RecordedProbe,
+    RunProfile,
+    SarifIssueWriter,
     Settings,
+    Shard,
+    TextRule,
+    TreeSnapshot,
+    _cache_files,
+    _changed_paths,
     _directory_issues,
+    _english_counterpart,
+    _extract_uris_and_ids,
+    _is_inert_raw_html,
+    _is_probed_by,
     _is_text_all_uppercase,
+    _latency_histogram,
+    _line_of_match,
+    _load_cache,
+    _load_link_cache,
+    _local_path_uri_issues,
+    _markdown_links_and_ids,
+    _locality_order,
+    _merged_partial_results,
     _plain_text_issues,
+    _positive_int_argument,
+    _positive_seconds_argument,
+    _profile_report,
+    _pooled_http_session,
+    _render_doc,
     _render_markdown_to_html,
+    _rendered_doc,
+    _read_text,
+    _retry_after_seconds,
+    _reverified_changes,
+    _run_scope,
+    _save_cache,
+    _save_link_cache,
+    _save_partial_result,
+    _save_run_caches,
+    _shard_argument,
+    _shard_docs,
+    _text_rule_issues,
+    _uri_availability_issues,
+    read_html_text,
 )
 
 
@@ -57,6 +116,17 @@ def test_text_issues():
         "line 14: 'ShOULD        nOt' MUST be capitalized ('SHOULD        NOT')",
         "line 15: 'mAy' MUST be capitalized ('MAY')",
         "line 17: '- e' should start with a capital letter after the dash",
+        "line 4: Extra spaces at the end of the line",
+        "line 8: Extra spaces at the end of the line",
+        "line 10: Extra spaces at the end of the line",
+        "line 26: Extra spaces at the end of the line",
+        "line 19: Tabs are not allowed",
+        "line 20: Tabs are not allowed",
+        "line 21: Tabs are not allowed",
+        "line 22: Tabs are not allowed",
+        "line 23: Tabs are not allowed",
+        "line 24: Tabs are not allowed",
+        "line 25: Tabs are not allowed",
     }
 
 
@@ -326,3 +396,967 @@ async def test_app(monkeypatch):
             " Spec - Version 1.0.0')",
         ),
     }
+
+
+@asynccontextmanager
+async def _serving(routes: web.RouteTableDef) -> AsyncIterator[str]:
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+def _fake_website() -> web.RouteTableDef:
+    routes = web.RouteTableDef()
+
+    @routes.get("/ok")
+    async def ok(request):
+        return web.Response(text="ok")
+
+    @routes.get("/also-ok")
+    async def also_ok(request):
+        return web.Response(text="also ok")
+
+    throttled = set()
+
+    @routes.get("/throttled")
+    async def throttled_once(request):
+        if request.path_qs in throttled:
+            return web.Response(text="ok")
+        throttled.add(request.path_qs)
+        return web.Response(status=429, headers={"Retry-After": "0"})
+
+    @routes.get("/etag")
+    async def etag(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="tagged", headers={"ETag": '"v1"'})
+
+    @routes.get("/redirect")
+    async def redirect(request):
+        raise web.HTTPFound("/ok")
+
+    @routes.get("/always-throttled")
+    async def always_throttled(request):
+        return web.Response(status=429, headers={"Retry-After": "0"})
+
+    @routes.get("/slow")
+    async def slow(request):
+        await asyncio.sleep(1)  # longer than the timeout of the tests using it
+        return web.Response(text="too late")
+
+    return routes
+
+
+@pytest.mark.asyncio
+async def test_probes_share_pooled_connections():
+    settings = Settings(excluded_paths=set())
+    async with _serving(_fake_website()) as base_url:
+        async with _pooled_http_session(settings) as session:
+            settings.http_session = session
+            for path in ("/ok", "/also-ok", "/missing"):
+                await _uri_availability_issues(base_url + path, settings)
+    assert settings.pool_stats.requests == 3
+    assert settings.pool_stats.connections_created == 1
+    assert settings.pool_stats.connections_reused == 2
+
+
+@pytest.mark.asyncio
+async def test_same_uri_is_probed_once_per_run(tmp_path):
+    settings = Settings(excluded_paths=set())
+    async with _serving(_fake_website()) as base_url:
+        (tmp_path / "a.md").write_text(f"[x]({base_url}/missing)\n")
+        (tmp_path / "b.md").write_text(
+            f"[x]({base_url.upper()}/missing#top) [y]({base_url}/missing)\n"
+        )
+        issues = set(await _directory_issues(tmp_path, settings))
+    assert issues == {
+        (tmp_path / "a.md", f"{repr(base_url + '/missing')} was not found"),
+        (tmp_path / "b.md", f"{repr(base_url.upper() + '/missing#top')} was not found"),
+        (tmp_path / "b.md", f"{repr(base_url + '/missing')} was not found"),
+    }
+    assert settings.pool_stats.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_fresh_cached_links_are_not_probed_again():
+    settings = Settings(excluded_paths=set(), link_cache={})
+    async with _serving(_fake_website()) as base_url:
+        settings.link_cache[base_url + "/missing"] = CachedProbe(
+            status=200, checked_at=time.time()
+        )
+        async with _pooled_http_session(settings) as session:
+            settings.http_session = session
+            assert await _uri_availability_issues(base_url + "/missing", settings) == []
+    assert settings.pool_stats.requests == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_cached_links_are_revalidated():
+    settings = Settings(excluded_paths=set(), link_cache={})
+    async with _serving(_fake_website()) as base_url:
+        uri = base_url + "/etag"
+        # a 304 keeps the cached verdict, whatever it was
+        settings.link_cache[uri] = CachedProbe(status=404, checked_at=0, etag='"v1"')
+        async with _pooled_http_session(settings) as session:
+            settings.http_session = session
+            assert await _uri_availability_issues(uri, settings) == [
+                f"{repr(uri)} was not found"
+            ]
+    assert settings.pool_stats.requests == 1
+    assert settings.link_cache[uri].status == 404
+    assert settings.link_cache[uri].checked_at > 0
+
+
+def test_link_cache_survives_a_round_trip(tmp_path):
+    cache_path = tmp_path / ".verify_cache" / "links.json"
+    link_cache = {"https://xregistry.io/": CachedProbe(status=200, checked_at=1.5)}
+    _save_link_cache(cache_path, link_cache)
+    assert _load_link_cache(cache_path) == link_cache
+
+
+def test_corrupted_link_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "links.json"
+    cache_path.write_text("{not json")
+    assert _load_link_cache(cache_path) == {}
+
+
+@pytest.mark.asyncio
+async def test_throttled_links_are_retried_after_the_requested_delay():
+    settings = Settings(excluded_paths=set(), http_backoff_base_seconds=0)
+    async with _serving(_fake_website()) as base_url:
+        async with _pooled_http_session(settings) as session:
+            settings.http_session = session
+            assert await _uri_availability_issues(base_url + "/throttled", settings) == []
+    assert settings.pool_stats.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_probes_of_one_host_are_limited():
+    in_flight, max_in_flight = 0, 0
+    routes = web.RouteTableDef()
+
+    @routes.get("/{page}")
+    async def slow(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return web.Response(text="ok")
+
+    settings = Settings(excluded_paths=set(), http_max_per_host=2)
+    async with _serving(routes) as base_url:
+        async with _pooled_http_session(settings) as session:
+            settings.http_session = session
+            await asyncio.gather(
+                *[
+                    _uri_availability_issues(f"{base_url}/{page}", settings)
+                    for page in range(10)
+                ]
+            )
+    assert max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_resting_host_neither_holds_global_slots_nor_rests_too_long():
+    scheduler = ProbeScheduler(
+        max_concurrency=1, max_per_host=1, max_defer_seconds=0.05
+    )
+    scheduler.defer("throttled.test", 3600)
+    entered = []
+
+    async def probe(host):
+        async with scheduler.slot(host):
+            entered.append(host)
+
+    start_time = time.monotonic()
+    await asyncio.wait_for(
+        asyncio.gather(probe("throttled.test"), probe("other.test")), timeout=5
+    )
+    assert entered == ["other.test", "throttled.test"]
+    assert 0.05 <= time.monotonic() - start_time < 1
+
+
+@pytest.mark.parametrize(
+    "given, expected",
+    (
+        (None, None),
+        ("120", 120),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0),  # already in the past
+        ("soon", None),
+    ),
+)
+def test_retry_after_parsing(given, expected):
+    assert _retry_after_seconds(given) == expected
+
+
+@pytest.mark.asyncio
+async def test_missing_segment_suggests_the_closest_id(tmp_path):
+    (tmp_path / "target.md").write_text("# Target\n\n## Getting Started\n")
+    source = tmp_path / "source.md"
+    settings = Settings(excluded_paths=set())
+    assert await _local_path_uri_issues(
+        "target.md#getting-startd", source, settings
+    ) == [
+        f"{(tmp_path / 'target.md').as_posix()} does not contain '#getting-startd' "
+        "segment (did you mean '#getting-started'?)"
+    ]
+    assert (
+        await _local_path_uri_issues("target.md#getting-started", source, settings)
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_docs_rendered_in_processes_match_inline_rendering():
+    path = _FAKE_DOCS_DIR / "link-verification.md"
+    async with _run_scope(
+        Settings(excluded_paths=set(), render_processes=2)
+    ) as settings:
+        assert settings.render_executor is not None
+        assert await _rendered_doc(path, settings) == _render_doc(path)
+
+
+@pytest.mark.parametrize(
+    "text, pattern, expected",
+    (
+        ("first", "first", 1),
+        ("\nsecond", "second", 2),
+        ("first\n", "\n", 1),  # a newline belongs to the line it ends
+        ("a\n\n\nd\ne", "e", 5),
+    ),
+)
+def test_line_of_match(text, pattern, expected):
+    assert _line_of_match(re.search(pattern, text), text) == expected
+
+
+def test_text_rules_may_match_overlapping_text():
+    assert set(_plain_text_issues("Intro\n- may be\n")) == {
+        "line 2: '- m' should start with a capital letter after the dash",
+        "line 2: 'may' MUST be capitalized ('MAY')",
+    }
+
+
+@pytest.mark.parametrize(
+    "given, expected",
+    (
+        (
+            "see [x](other.md/#segment)",
+            "line 1: '/#' found, hrefs to a segment must not end with a '/'",
+        ),
+        ("a\nmore `code\n", "line 2: Uneven back-ticks"),
+        ("```\nfenced\n```\n", None),
+    ),
+)
+def test_format_text_rules(given, expected):
+    assert set(_plain_text_issues(given)) == ({expected} if expected else set())
+
+
+@pytest.mark.parametrize(
+    "relative_path, expected",
+    (
+        ("core/spec.md", {"uneven-backticks"}),
+        ("core/samples/README.md", set()),
+        ("languages/de/core/spec.md", set()),
+        ("core/spec.html", None),
+    ),
+)
+def test_format_rules_keep_the_scope_of_the_makefile(relative_path, expected):
+    # unlike the other rules, not skipped in docs marked with no verify specs
+    text = "<!-- no verify specs -->\n\tsee [x](other.md/#segment) `code \n"
+    issues = _plain_text_issues(text, PurePosixPath(relative_path))
+    markdown_rules = {"tab", "trailing-space", "slash-hash-href"}
+    assert {issue.rule_id for issue in issues} == (
+        set() if expected is None else markdown_rules | expected
+    )
+
+
+def test_text_rules_can_be_plugged_in():
+    rules = [
+        TextRule("todo", re.compile("TODO"), "T", lambda match: "Leftover TODO"),
+        TextRule("fixme", re.compile("fixme", re.IGNORECASE), "f", lambda match: "Leftover FIXME"),
+    ]
+    assert list(_text_rule_issues("TODO\nok\nFixMe", rules)) == [
+        "line 1: Leftover TODO",
+        "line 3: Leftover FIXME",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_local_results_are_replayed_until_a_dependency_changes(
+    tmp_path, monkeypatch
+):
+    (tmp_path / "a.md").write_text("# A\n\n[b](b.md#target)\n")
+    (tmp_path / "b.md").write_text("# B\n\n## Target\n")
+    file_result_cache = {}
+
+    async def issues():
+        verify._read_text.cache_clear()
+        verify._content_hash.cache_clear()
+        verify.read_html_text.cache_clear()
+        return set(
+            await _directory_issues(
+                tmp_path,
+                Settings(
+                    excluded_paths=set(),
+                    file_result_cache=file_result_cache,
+                    render_processes=1,
+                ),
+            )
+        )
+
+    assert await issues() == set()
+    with monkeypatch.context() as patch:
+        patch.setattr(verify, "_render_doc", None)  # nothing may be rendered
+        assert await issues() == set()
+
+    (tmp_path / "b.md").write_text("# B\n\n## Renamed\n")
+    assert await issues() == {
+        (
+            tmp_path / "a.md",
+            f"{(tmp_path / 'b.md').as_posix()} does not contain '#target' segment",
+        ),
+    }
+
+
+@pytest.mark.asyncio
+async def test_saved_local_results_drop_the_docs_that_are_gone(tmp_path):
+    (tmp_path / "kept.md").write_text("# Kept\n")
+    (tmp_path / "gone.md").write_text("# Gone\n")
+    settings = Settings(excluded_paths=set(), file_result_cache={})
+    settings.tree = TreeSnapshot(tmp_path)
+    await _directory_issues(tmp_path, settings)
+    (tmp_path / "gone.md").unlink()
+    settings.tree = TreeSnapshot(tmp_path)
+    _save_run_caches(tmp_path, settings)
+    assert _load_cache(
+        tmp_path / ".verify_cache" / "files.json", CachedFileResult
+    ).keys() == {(tmp_path / "kept.md").as_posix()}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cross_check", ({"use_beautifulsoup": True}, {"use_markdown_fast_path": False})
+)
+async def test_cross_checks_do_not_replay_local_results(
+    tmp_path, monkeypatch, cross_check
+):
+    (tmp_path / "a.md").write_text("# A\n\n[b](b.md#b)\n")
+    (tmp_path / "b.md").write_text("# B\n")
+    file_result_cache = {}
+    settings = Settings(
+        excluded_paths=set(), file_result_cache=file_result_cache, render_processes=1
+    )
+    assert await _directory_issues(tmp_path, settings) == []
+    assert len(file_result_cache) == 2  # warm
+
+    render_arguments = []
+
+    def render_doc(*arguments):
+        render_arguments.append(arguments)
+        return _render_doc(*arguments)
+
+    monkeypatch.setattr(verify, "_render_doc", render_doc)
+    settings = Settings(
+        excluded_paths=set(),
+        file_result_cache=file_result_cache,
+        render_processes=1,
+        **cross_check,
+    )
+    assert await _directory_issues(tmp_path, settings) == []
+    modes = (settings.use_beautifulsoup, settings.use_markdown_fast_path)
+    assert sorted(render_arguments) == [
+        (tmp_path / "a.md", *modes),
+        (tmp_path / "b.md", *modes),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_only_changed_docs_and_docs_linking_into_them_are_verified(tmp_path):
+    (tmp_path / "linking.md").write_text("# Linking\n\n[x](changed.md#gone)\n")
+    (tmp_path / "changed.md").write_text("# Changed\n\nmust\n")
+    (tmp_path / "unrelated.md").write_text("# Unrelated\n\nmust\n")
+    settings = Settings(
+        excluded_paths=set(), changed_paths={(tmp_path / "changed.md").resolve()}
+    )
+    assert set(await _directory_issues(tmp_path, settings)) == {
+        (
+            tmp_path / "linking.md",
+            f"{(tmp_path / 'changed.md').as_posix()} does not contain '#gone' segment",
+        ),
+        (tmp_path / "changed.md", "line 3: 'must' MUST be capitalized ('MUST')"),
+    }
+    assert settings.link_graph[(tmp_path / "changed.md").resolve()] == {
+        (tmp_path / "linking.md").resolve()
+    }
+
+
+@pytest.mark.asyncio
+async def test_link_graph_drops_the_links_removed_since(tmp_path):
+    (tmp_path / "linking.md").write_text("# Linking\n\n[x](linked.md)\n")
+    (tmp_path / "linked.md").write_text("# Linked\n")
+    linked = (tmp_path / "linked.md").resolve()
+    settings = Settings(excluded_paths=set(), changed_paths={linked})
+    await _directory_issues(tmp_path, settings)
+    assert settings.link_graph[linked] == {(tmp_path / "linking.md").resolve()}
+
+    (tmp_path / "linking.md").write_text("# Linking\n")
+    settings = replace(settings, renders={})
+    await _directory_issues(tmp_path, settings)
+    assert linked not in settings.link_graph
+
+
+def test_changed_paths_include_uncommitted_and_untracked_files(tmp_path):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / "committed.md").write_text("# Committed\n")
+    (tmp_path / "modified.md").write_text("# Modified\n")
+    (tmp_path / "renamed.md").write_text("# Renamed\n")
+    git("add", ".")
+    git("-c", "user.name=test", "-c", "user.email=test@test", "commit", "-qm", "docs")
+    (tmp_path / "modified.md").write_text("# Modified again\n")
+    (tmp_path / "untracked.md").write_text("# Untracked\n")
+    git("mv", "renamed.md", "new-name.md")
+    assert _changed_paths(tmp_path, "HEAD") == {
+        (tmp_path / "modified.md").resolve(),
+        (tmp_path / "untracked.md").resolve(),
+        # the docs linking to the old name are affected too
+        (tmp_path / "renamed.md").resolve(),
+        (tmp_path / "new-name.md").resolve(),
+    }
+
+
+def test_tree_snapshot_answers_path_queries_from_a_single_scan(tmp_path):
+    (tmp_path / "languages" / "he").mkdir(parents=True)
+    (tmp_path / ".pytest_cache").mkdir()
+    (tmp_path / ".pytest_cache" / "README.md").write_text("cache")
+    (tmp_path / "spec.md").write_text("# Spec\n")
+    tree = TreeSnapshot(tmp_path)
+    (tmp_path / "created-after-the-scan.md").write_text("# Late\n")
+
+    assert tree.exists(tmp_path / "spec.md")
+    assert tree.exists(tmp_path / "languages" / ".." / "spec.md")
+    assert not tree.exists(tmp_path / "created-after-the-scan.md")
+    assert tree.info(tmp_path / "spec.md").size == len("# Spec\n")
+    assert tree.subdirectories(tmp_path / "languages") == [tmp_path / "languages" / "he"]
+    assert set(tree.files()) == {
+        tmp_path / "spec.md",
+        tmp_path / ".pytest_cache" / "README.md",
+    }
+    assert _cache_files(tree) == {tmp_path / ".pytest_cache" / "README.md"}
+    # paths outside of the snapshot are looked up on the file system
+    assert tree.exists(Path(__file__))
+
+
+@pytest.mark.asyncio
+async def test_links_into_symlinked_directories_are_looked_up(tmp_path):
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "target.md").write_text("# Target\n")
+    (tmp_path / "root").mkdir()
+    (tmp_path / "root" / "linked").symlink_to(tmp_path / "shared")
+    (tmp_path / "root" / "spec.md").write_text("# Spec\n\n[x](linked/target.md)\n")
+    tree = TreeSnapshot(tmp_path / "root")
+    assert tree.exists(tmp_path / "root" / "linked" / "target.md")
+    # like pathlib's rglob, the docs under the symlinked directory are not verified
+    assert set(tree.files()) == {tmp_path / "root" / "spec.md"}
+    settings = Settings(excluded_paths=set())
+    assert await _directory_issues(tmp_path / "root", settings) == []
+
+
+_REPO_DOCS = sorted(
+    path
+    for path in Path(__file__).parent.parent.rglob("*.md")
+    if ".pytest_cache" not in path.parts
+)
+
+
+@pytest.mark.parametrize(
+    "path",
+    _REPO_DOCS,
+    ids=lambda path: path.relative_to(Path(__file__).parent.parent).as_posix(),
+)
+def test_streaming_extraction_matches_beautifulsoup(path):
+    html = read_html_text(path)
+    assert _extract_uris_and_ids(html) == _extract_uris_and_ids(
+        html, use_beautifulsoup=True
+    )
+
+
+def test_streaming_extraction_handles_entities_and_void_elements():
+    uris, ids = _extract_uris_and_ids(
+        '<a href=" a.md#x&amp;y " id="top"/><img id="image"><a name="no-href">'
+    )
+    assert uris == ("a.md#x&y",)
+    assert ids == {"top", "image"}
+
+
+@pytest.mark.parametrize(
+    "path",
+    [path for path in _REPO_DOCS if path.suffix == ".md"],
+    ids=lambda path: path.relative_to(Path(__file__).parent.parent).as_posix(),
+)
+def test_markdown_fast_path_matches_rendering(path):
+    assert _render_doc(path) == _render_doc(path, use_fast_path=False)
+
+
+def test_markdown_fast_path_reads_links_and_ids_from_the_tree():
+    assert _markdown_links_and_ids(
+        "# The *Title*\n\nSee [a](a.md#x&y), <https://b.io> and [c][c].\n\n"
+        "    [not](a-link.md)\n\n<!-- no verify-specs -->\n\n[c]: c.md\n"
+    ) == (("a.md#x&y", "https://b.io", "c.md"), {"the-title"}, False)
+    assert _markdown_links_and_ids("<!-- no verify-links -->\n\n[a](a.md)\n") == (
+        ("a.md",),
+        frozenset(),
+        True,
+    )
+
+
+@pytest.mark.parametrize(
+    "markdown_text",
+    (
+        '<a href="a.md">a</a>\n',
+        '<div id="x"></div>\n',
+        "See [ab][undefined].\n",
+    ),
+)
+def test_markdown_fast_path_leaves_raw_links_and_bookmarks_to_rendering(
+    markdown_text,
+):
+    assert _markdown_links_and_ids(markdown_text) is None
+
+
+@pytest.mark.parametrize(
+    "raw_html, expected",
+    (
+        ("<!-- no verify-specs -->", True),
+        ("<b>a < b</b>", True),
+        ("<script>let a = '<a href=x>';</script>", True),
+        ('<a href="a.md">a</a>', False),
+        ("<!-- never closed", False),
+        ('<img alt="never closed', False),
+        ("<style>", False),
+        ("<script>let a = 1;", False),
+    ),
+)
+def test_raw_html_is_inert_without_links_ids_and_open_elements(raw_html, expected):
+    assert _is_inert_raw_html(raw_html) is expected
+
+
+def test_memory_bounded_cache_evicts_least_recently_used_values():
+    key_size = sys.getsizeof("a")  # the keys are counted too
+    cache = MemoryBoundedCache(max_bytes=10 + 2 * key_size)
+
+    @cache.memoize(size_of=lambda text, key: len(text))
+    def text_of(key):
+        return key * 4
+
+    assert text_of("a") == "aaaa"
+    assert text_of("b") == "bbbb"
+    assert text_of("a") == "aaaa"  # "b" is now the least recently used
+    assert text_of("c") == "cccc"
+    assert text_of("a") == "aaaa"
+    assert text_of("b") == "bbbb"
+    stats = cache.stats["text_of"]
+    assert (stats.hits, stats.misses, stats.evictions) == (2, 4, 2)
+    assert cache.current_bytes <= 10 + 2 * key_size
+    text_of.cache_clear()
+    assert cache.current_bytes == 0
+
+
+def test_memory_bounded_cache_drops_stale_versions_and_what_was_computed_from_them():
+    cache = MemoryBoundedCache()
+    versions = {"a": 1}
+
+    @cache.memoize(
+        size_of=lambda text, key: len(text), version_of=lambda key: versions[key]
+    )
+    def text_of(key):
+        return key * versions[key]
+
+    @cache.memoize(size_of=lambda length, text: 0)
+    def length_of(text):
+        return len(text)
+
+    assert length_of(text_of("a")) == 1
+    versions["a"] = 2  # saved
+    assert length_of(text_of("a")) == 2
+    assert cache.current_bytes == len("aa") + sys.getsizeof("a") + sys.getsizeof("aa")
+    text_of.forget(lambda key: key == "a")
+    assert cache.current_bytes == 0
+
+
+def test_memory_bounded_cache_counts_the_texts_values_are_keyed_by():
+    cache = MemoryBoundedCache()
+
+    @cache.memoize(size_of=lambda length, text: 0)
+    def length_of(text):
+        return len(text)
+
+    text = "x" * 10_000
+    length_of(text)
+    assert cache.current_bytes == sys.getsizeof(text)
+
+
+@pytest.mark.parametrize(
+    "given, expected",
+    (
+        ("docs/spec.md", "docs/spec.md"),
+        ("docs/languages/he/spec.md", "docs/spec.md"),
+        ("docs/languages/he/sub/languages/fr/x.md", "docs/languages/he/sub/x.md"),
+        ("docs/languages/README.md", "docs/languages/README.md"),
+    ),
+)
+def test_english_counterpart(given, expected):
+    assert _english_counterpart(Path(given)) == Path(expected)
+
+
+def test_docs_are_verified_next_to_their_translations():
+    assert _locality_order(
+        [Path("a.md"), Path("b.md"), Path("languages/he/a.md")]
+    ) == [Path("a.md"), Path("languages/he/a.md"), Path("b.md")]
+
+
+def test_shards_partition_the_docs_evenly_by_size(tmp_path):
+    for name, size in (("a", 900), ("b", 500), ("c", 400), ("d", 100), ("e", 0)):
+        (tmp_path / f"{name}.md").write_text("x" * size)
+    tree = TreeSnapshot(tmp_path)
+    paths = list(tree.files())
+    shards = [_shard_docs(paths, Shard(index, 2), tree) for index in range(2)]
+    assert shards[0] | shards[1] == set(paths)
+    assert not shards[0] & shards[1]
+    assert {path.name for path in shards[0]} == {"a.md", "d.md"}
+    assert shards == [_shard_docs(reversed(paths), Shard(i, 2), tree) for i in (0, 1)]
+
+
+def test_each_uri_is_probed_by_exactly_one_shard():
+    for uri in ("https://a.example/x", "https://b.example/y#z", "http://c.example"):
+        assert sum(_is_probed_by(uri, Shard(index, 3)) for index in range(3)) == 1
+    assert all(_is_probed_by("local.md", Shard(index, 3)) for index in range(3))
+
+
+@pytest.mark.parametrize(
+    "given, expected", (("1/4", Shard(0, 4)), ("4/4", Shard(3, 4)))
+)
+def test_shard_argument(given, expected):
+    assert _shard_argument(given) == expected
+
+
+@pytest.mark.parametrize("given", ("0", "-1", "a", "1.5"))
+def test_invalid_positive_int_argument(given):
+    with pytest.raises(ArgumentTypeError):
+        _positive_int_argument(given)
+
+
+@pytest.mark.parametrize("given", ("0", "-0.5", "soon"))
+def test_invalid_positive_seconds_argument(given):
+    with pytest.raises(ArgumentTypeError):
+        _positive_seconds_argument(given)
+
+
+def test_watch_rejects_the_outputs_of_a_finished_run(tmp_path):
+    completed = subprocess.run(
+        [sys.executable, verify.__file__, "--watch", "--sarif", "issues.sarif"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+    assert completed.returncode == 2
+    assert "--watch cannot be combined with --sarif" in completed.stderr
+    assert not (tmp_path / "issues.sarif").exists()
+
+
+@pytest.mark.parametrize("given", ("0/4", "5/4", "1", "a/b"))
+def test_invalid_shard_argument(given):
+    with pytest.raises(ArgumentTypeError):
+        _shard_argument(given)
+
+
+@pytest.mark.asyncio
+async def test_merged_shards_report_the_issues_of_an_unsharded_run(tmp_path):
+    async with _serving(_fake_website()) as base_url:
+        for name in "abcde":
+            (tmp_path / f"{name}.md").write_text(
+                f"# {name}\n\nmust [x]({base_url}/missing-{name}) "
+                f"[y]({base_url}/missing) [z](a.md#gone)\n"
+            )
+        unsharded = await _directory_issues(tmp_path, Settings(excluded_paths=set()))
+        partial_results = []
+        requests = 0
+        for index in range(3):
+            settings = Settings(excluded_paths=set(), shard=Shard(index, 3))
+            partial_result = tmp_path / "results" / f"{index}.json"
+            _save_partial_result(
+                partial_result,
+                settings.shard,
+                await _directory_issues(tmp_path, settings),
+            )
+            partial_results.append(partial_result)
+            requests += settings.pool_stats.requests
+    assert sorted(_merged_partial_results(partial_results)) == sorted(unsharded)
+    assert requests == 6  # every distinct uri once, whichever doc it is linked from
+
+
+def test_partial_results_of_a_missing_shard_are_not_merged(tmp_path):
+    _save_partial_result(tmp_path / "1.json", Shard(0, 2), [])
+    with pytest.raises(ValueError, match="1/2"):
+        _merged_partial_results([tmp_path / "1.json"])
+
+
+def test_latency_histogram():
+    histogram = _latency_histogram([0.05, 0.1, 0.3, 11])
+    assert histogram["<=0.1s"] == 2
+    assert histogram["<=0.5s"] == 1
+    assert histogram[">10s"] == 1
+    assert sum(histogram.values()) == 4
+
+
+@pytest.mark.asyncio
+async def test_profile_tells_where_the_time_of_a_run_goes(tmp_path):
+    (tmp_path / "a.md").write_text("# A\n")
+    async with _serving(_fake_website()) as base_url:
+        (tmp_path / "b.md").write_text(f"# B\n\n[x]({base_url}/ok) [y](a.md#a)\n")
+        file_result_cache = {}
+        reports = []
+        for _ in ("cold", "replayed"):
+            settings = Settings(
+                excluded_paths=set(),
+                file_result_cache=file_result_cache,
+                profile=RunProfile(),
+            )
+            await _directory_issues(tmp_path, settings)
+            reports.append(
+                _profile_report(settings.profile, wall_seconds=1, cpu_seconds=1)
+            )
+    cold, replayed = reports
+    assert set(cold["files"][(tmp_path / "b.md").as_posix()]) == {
+        "http",
+        "local-links",
+        "render",
+        "text-rules",
+        "translations",
+    }
+    assert cold["phases"]["render"]["cpu_seconds"] > 0
+    assert cold["phases"]["http"]["cpu_seconds"] is None
+    assert cold["slowest_uris"][0]["uri"] == base_url + "/ok"
+    (host_report,) = cold["hosts"].values()
+    assert host_report["requests"] == 1
+    assert cold["caches"]["file-results"]["hit_rate"] == 0.0
+    assert replayed["caches"]["file-results"]["hit_rate"] == 1.0
+
+
+def test_text_rule_issues_tell_their_rule_and_location():
+    (issue,) = _text_rule_issues("first\nsome  must\n")
+    assert issue == "line 2: 'must' MUST be capitalized ('MUST')"
+    assert (issue.rule_id, issue.line, issue.column) == ("miscased-phrase", 2, 7)
+    assert issue.message == "'must' MUST be capitalized ('MUST')"
+
+
+def test_structured_issues_survive_caches_and_processes(tmp_path):
+    issue = Issue("line 3: bad", rule_id="some-rule", line=3, column=4, message="bad")
+    _save_cache(
+        tmp_path / "files.json",
+        {"a.md": CachedFileResult("hash", "version", "hash", [], False, [issue])},
+    )
+    (loaded,) = _load_cache(tmp_path / "files.json", CachedFileResult)["a.md"].issues
+    for copy in (loaded, pickle.loads(pickle.dumps(issue))):
+        assert copy == issue
+        assert copy.as_dict() == issue.as_dict()
+
+
+@pytest.mark.asyncio
+async def test_issues_are_streamed_as_json_lines_and_sarif(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.md").write_text("# A\n\nmust [x](gone.md)\n")
+    (tmp_path / "docs" / "b.md").write_text("# B\n")
+    writers = [
+        JsonLinesIssueWriter(tmp_path / "issues.jsonl"),
+        SarifIssueWriter(tmp_path / "issues.sarif"),
+    ]
+    settings = Settings(excluded_paths=set(), issue_writers=writers)
+    await _directory_issues(tmp_path / "docs", settings)
+    for writer in writers:
+        writer.close()
+
+    a_md = (tmp_path / "docs" / "a.md").as_posix()
+    records = [
+        json.loads(line)
+        for line in (tmp_path / "issues.jsonl").read_text().splitlines()
+    ]
+    assert sorted(records, key=lambda record: record["rule"]) == [
+        {
+            "path": a_md,
+            "line": 3,
+            "column": 1,
+            "rule": "miscased-phrase",
+            "message": "'must' MUST be capitalized ('MUST')",
+        },
+        {
+            "path": a_md,
+            "line": None,
+            "column": None,
+            "rule": "missing-file",
+            "message": f"{(tmp_path / 'docs' / 'gone.md').as_posix()} does not exist",
+        },
+    ]
+    (run,) = json.loads((tmp_path / "issues.sarif").read_text())["runs"]
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == [
+        "miscased-phrase",
+        "missing-file",
+    ]
+    assert {result["ruleId"] for result in run["results"]} == {
+        "miscased-phrase",
+        "missing-file",
+    }
+
+
+@pytest.mark.asyncio
+async def test_recorded_link_checks_are_replayed_offline(tmp_path):
+    cassette = {}
+    async with _serving(_fake_website()) as base_url:
+        uris = [
+            f"{base_url}/{path}"
+            for path in ("ok", "missing", "redirect", "always-throttled", "slow")
+        ]
+        (tmp_path / "a.md").write_text(
+            "# A\n\n" + " ".join(f"[x]({uri})" for uri in uris) + "\n"
+        )
+        recording_settings = Settings(
+            excluded_paths=set(),
+            http_timeout_seconds=0.2,
+            http_max_get_attemps=2,
+            http_backoff_max_seconds=0,
+            link_cache={HttpUri(uris[1]): CachedProbe(200, checked_at=time.time())},
+            cassette=cassette,
+            records_cassette=True,
+        )
+        recorded_issues = await _directory_issues(tmp_path, recording_settings)
+    ok, missing, redirect, throttled, slow = (cassette[uri] for uri in uris)
+    assert (ok.status, missing.status, throttled.status, slow.status) == (
+        200,
+        404,  # even though the link cache knew better, recording probes them all
+        429,
+        None,
+    )
+    assert throttled.headers["Retry-After"] == "0"
+    assert redirect.redirected_to == f"{base_url}/ok"
+
+    # the server is gone, only the cassette answers
+    replaying_settings = Settings(excluded_paths=set(), cassette=cassette)
+    assert await _directory_issues(tmp_path, replaying_settings) == recorded_issues
+    assert replaying_settings.pool_stats.requests == 0
+
+
+@pytest.mark.asyncio
+async def test_links_missing_from_the_cassette_are_reported():
+    settings = Settings(excluded_paths=set(), cassette={})
+    (issue,) = await _uri_availability_issues(HttpUri("https://a.test/"), settings)
+    assert issue.rule_id == "unrecorded-link"
+
+
+def test_cassette_survives_a_round_trip(tmp_path):
+    cassette = {
+        HttpUri("https://a.test/"): RecordedProbe(
+            status=301, seconds=0.25, headers={"Location": "/b"}
+        ),
+        HttpUri("https://b.test/"): RecordedProbe(status=None, seconds=10),
+    }
+    _save_cache(tmp_path / "cassette.json", cassette)
+    assert _load_cache(tmp_path / "cassette.json", RecordedProbe) == cassette
+
+
+def test_cached_texts_are_read_again_once_saved(tmp_path):
+    path = tmp_path / "a.md"
+    path.write_text("first")
+    assert _read_text(path) == "first"
+    path.write_text("second, longer")
+    assert _read_text(path) == "second, longer"
+
+
+@pytest.mark.asyncio
+async def test_watch_verifies_saved_docs_and_docs_looking_into_them(tmp_path):
+    (tmp_path / "linking.md").write_text("# Linking\n\n[x](linked.md#old)\n")
+    (tmp_path / "linked.md").write_text("# Old\n")
+    (tmp_path / "unrelated.md").write_text("# Unrelated\n")
+    async with _run_scope(
+        Settings(excluded_paths=set(), render_processes=1, file_result_cache={})
+    ) as settings:
+        settings.tree = TreeSnapshot(tmp_path)
+        assert await _directory_issues(tmp_path, settings) == []
+        unrelated_render = settings.renders[tmp_path / "unrelated.md"]
+        settings, issues = await _reverified_changes(tmp_path, settings, [])
+        assert issues is None
+
+        (tmp_path / "linked.md").write_text("# New heading\n")
+        settings, issues = await _reverified_changes(tmp_path, settings, [])
+        assert issues == [
+            (
+                tmp_path / "linking.md",
+                f"{(tmp_path / 'linked.md').as_posix()} does not contain '#old' segment",
+            )
+        ]
+        assert settings.renders[tmp_path / "unrelated.md"] is unrelated_render
+
+
+@pytest.mark.asyncio
+async def test_watch_ignores_the_caches_it_saves(tmp_path):
+    (tmp_path / "a.md").write_text("# A\n\n[b](b.md#b)\n")
+    (tmp_path / "b.md").write_text("# B\n")
+    async with _run_scope(
+        Settings(
+            excluded_paths=set(),
+            render_processes=1,
+            file_result_cache={},
+            link_cache={},
+        )
+    ) as settings:
+        settings.tree = TreeSnapshot(tmp_path)
+        assert await _directory_issues(tmp_path, settings) == []
+        for _ in range(2):
+            _save_run_caches(tmp_path, settings)
+            (tmp_path / ".schema_cache").mkdir(exist_ok=True)
+            (tmp_path / ".schema_cache" / "manifest.json").write_text(str(time.time()))
+            settings, issues = await _reverified_changes(tmp_path, settings, [])
+            assert issues is None
+
+
+@pytest.mark.asyncio
+async def test_watch_reports_the_issues_of_the_docs_it_did_not_verify_again(
+    tmp_path,
+):
+    (tmp_path / "a.md").write_text("# A\n\n[x](#nope)\n")
+    (tmp_path / "b.md").write_text("# B\n")
+    (tmp_path / "c.md").write_text("# C\n\n[b](b.md)\n")
+    async with _run_scope(
+        Settings(excluded_paths=set(), render_processes=1, file_result_cache={})
+    ) as settings:
+        settings.tree = TreeSnapshot(tmp_path)
+        issues = list(await _directory_issues(tmp_path, settings))
+        broken_anchor_issues = [
+            (
+                tmp_path / "a.md",
+                f"{(tmp_path / 'a.md').as_posix()} does not contain '#nope' segment",
+            )
+        ]
+        assert issues == broken_anchor_issues
+
+        (tmp_path / "c.md").write_text("# C\n\nmust\n")
+        settings, issues = await _reverified_changes(tmp_path, settings, issues)
+        assert issues == broken_anchor_issues + [
+            (tmp_path / "c.md", "line 3: 'must' MUST be capitalized ('MUST')")
+        ]
+
+        (tmp_path / "a.md").write_text("# A\n")
+        settings, issues = await _reverified_changes(tmp_path, settings, issues)
+        assert issues == [
+            (tmp_path / "c.md", "line 3: 'must' MUST be capitalized ('MUST')")
+        ]
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of verify.py: micro-benchmarks of its hot paths, run against the
+real specs, and whole runs over a generated spec tree, whose external links are
+served by a local stub server.
+
+Usage:
+  python tools/verify-benchmark.py [line-lookup] [corpus] [--repeat N]
+      [--files N] [--paragraphs N] [--anchors N] [--cross-links N]
+      [--external-links N] [--languages N] [--latency-ms MS] [--json PATH]
+"""
+import asyncio
+import json
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+import timeit
+from argparse import ArgumentParser
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+import verify
+
+
+def _line_of_match_by_counting(match: re.Match, origin_text: str) -> int:
+    # the implementation _line_of_match replaced, kept as the baseline
+    return len(verify._NEWLINE_PATTERN.findall(origin_text, 0, match.start(0))) + 1
+
+
+def bench_line_lookup(repeat: int) -> None:
+    path = verify._REPO_ROOT / "core" / "spec.md"
+    text = verify._read_text(path)
+    matches = list(verify._PHRASES_THAT_MUST_BE_CAPITALIZED_PATTERN.finditer(text))
+    assert [verify._line_of_match(m, text) for m in matches] == [
+        _line_of_match_by_counting(m, text) for m in matches
+    ]
+
+    def counting():
+        for match in matches:
+            _line_of_match_by_counting(match, text)
+
+    def indexed():
+        verify._newline_offsets.cache_clear()  # include building the index
+        for match in matches:
+            verify._line_of_match(match, text)
+
+    counting_seconds = min(timeit.repeat(counting, number=1, repeat=repeat))
+    indexed_seconds = min(timeit.repeat(indexed, number=1, repeat=repeat))
+    print(
+        f"line lookup of {len(matches)} matches in {path.name} "
+        f"({text.count(chr(10))} lines): "
+        f"counting {counting_seconds * 1000:.2f}ms, "
+        f"indexed {indexed_seconds * 1000:.2f}ms "
+        f"({counting_seconds / indexed_seconds:.0f}x faster)"
+    )
+
+
+@dataclass(frozen=True)
+class CorpusShape:
+    files: int = 200
+    # of filler text, each under its own heading
+    paragraphs: int = 10
+    # links of every doc to the headings of the same doc
+    anchors: int = 5
+    # links of every doc to the headings of other docs
+    cross_links: int = 5
+    # links of every doc to the stub server, half of them shared with another doc
+    external_links: int = 2
+    # every doc is translated to this many languages
+    languages: int = 2
+    # of every response of the stub server
+    latency_ms: int = 20
+
+
+_FILLER_SENTENCES = (
+    "The registry keeps the resources of every group in a stable order.",
+    "Every version of a resource has its own attributes and metadata.",
+    "Clients read the model first and then walk the groups they know.",
+    "Servers answer with the attributes that were asked for and no others.",
+    "A document lists the groups, the resources and the versions it holds.",
+)
+
+
+@asynccontextmanager
+async def _stub_server(latency_ms: int) -> AsyncIterator[str]:
+    async def page(request):
+        await asyncio.sleep(latency_ms / 1000)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_route("*", "/{name:.*}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+def _corpus_doc_paths(shape: CorpusShape) -> List[Path]:
+    # about as many directories as docs in every directory
+    directories = max(1, round(shape.files**0.5))
+    return [
+        Path(f"part-{index % directories}") / f"doc-{index}.md"
+        for index in range(shape.files)
+    ]
+
+
+def _corpus_doc(
+    index: int, paths: List[Path], shape: CorpusShape, base_url: str, rng: random.Random
+) -> str:
+    path = paths[index]
+    links = [
+        f"[section {section}](#section-{section})"
+        for section in rng.choices(range(shape.paragraphs), k=shape.anchors)
+    ]
+    for other_path in rng.choices(paths, k=shape.cross_links):
+        section = rng.randrange(shape.paragraphs)
+        relative = Path("..") / other_path.parent.name / other_path.name
+        links.append(f"[{other_path.stem}]({relative.as_posix()}#section-{section})")
+    # the pages of every doc are also linked to by the doc before it
+    unique_pages = max(1, shape.files * shape.external_links // 2)
+    for link in range(shape.external_links):
+        page = (index * shape.external_links // 2 + link) % unique_pages
+        links.append(f"[page {page}]({base_url}/page-{page})")
+    rng.shuffle(links)
+    lines = [f"# {path.stem.capitalize()}", ""]
+    for section in range(shape.paragraphs):
+        sentences = rng.choices(_FILLER_SENTENCES, k=4)
+        sentences[1:1] = links[section :: shape.paragraphs]
+        lines += [f"## Section {section}", "", " ".join(sentences), ""]
+    return "\n".join(lines)
+
+
+def _write_corpus(root: Path, shape: CorpusShape, base_url: str) -> Tuple[int, int]:
+    """
+    Writes docs made of filler text and links under the given root, and their
+    translations in its languages directory, so that none has an issue.
+
+    :return: the number of docs and the number of their links
+    """
+    rng = random.Random(0)  # the same corpus on every run
+    paths = _corpus_doc_paths(shape)
+    directories = [root] + [
+        root / verify._LANGUAGES_DIR_NAME / f"lang-{language}"
+        for language in range(shape.languages)
+    ]
+    for index, path in enumerate(paths):
+        text = _corpus_doc(index, paths, shape, base_url, rng)
+        for directory in directories:
+            (directory / path.parent).mkdir(parents=True, exist_ok=True)
+            (directory / path).write_text(text, encoding="utf-8")
+    docs = len(paths) * len(directories)
+    if shape.languages:
+        (root / verify._LANGUAGES_DIR_NAME / "README.md").write_text(
+            "# Translations Directory\n", encoding="utf-8"
+        )
+        docs += 1
+    links_per_doc = shape.anchors + shape.cross_links + shape.external_links
+    return docs, links_per_doc * len(paths) * len(directories)
+
+
+def _peak_rss_bytes(who: int) -> int:
+    peak = resource.getrusage(who).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on linux
+
+
+async def _corpus_run_report(shape: CorpusShape) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        async with _stub_server(shape.latency_ms) as base_url:
+            files, links = _write_corpus(root, shape, base_url)
+            settings = verify.Settings(
+                excluded_paths=set(),
+                tree=verify.TreeSnapshot(root),
+                profile=verify.RunProfile(),
+            )
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            issues = list(await verify._directory_issues(root, settings))
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+    if issues:
+        # a broken corpus, or a broken checker, measures nothing
+        verify._print_issues(issues)
+        raise SystemExit(f"the corpus has {len(issues)} issues")
+    profile = verify._profile_report(settings.profile, wall_seconds, cpu_seconds)
+    return {
+        "shape": asdict(shape),
+        "files": files,
+        "links": links,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "files_per_second": files / wall_seconds,
+        "links_per_second": links / wall_seconds,
+        "peak_rss_bytes": _peak_rss_bytes(resource.RUSAGE_SELF),
+        # the largest of the rendering processes
+        "peak_renderer_rss_bytes": _peak_rss_bytes(resource.RUSAGE_CHILDREN),
+        "phases": profile["phases"],
+        "hosts": profile["hosts"],
+    }
+
+
+def bench_corpus(shape: CorpusShape, json_path: Optional[Path]) -> None:
+    report = asyncio.run(_corpus_run_report(shape))
+    print(
+        f"corpus of {report['files']} docs and {report['links']} links: "
+        f"{report['wall_seconds']:.2f}s, "
+        f"{report['files_per_second']:.0f} files/s, "
+        f"{report['links_per_second']:.0f} links/s, "
+        f"peak rss {report['peak_rss_bytes'] >> 20}MB "
+        f"(renderers {report['peak_renderer_rss_bytes'] >> 20}MB)"
+    )
+    for phase, phase_time in report["phases"].items():
+        cpu_seconds = phase_time["cpu_seconds"]
+        cpu = "" if cpu_seconds is None else f", cpu {cpu_seconds:.2f}s"
+        # summed over the docs, which are verified concurrently
+        print(f"  {phase}: wall {phase_time['wall_seconds']:.2f}s{cpu}")
+    if json_path is not None:
+        json_path.write_text(json.dumps(report, indent=1), encoding="utf-8")
+
+
+_BENCHMARKS = ("line-lookup", "corpus")
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="BENCHMARK",
+        help=f"the benchmarks to run out of {', '.join(_BENCHMARKS)}, all of them "
+        "by default",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    defaults = CorpusShape()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    parser.add_argument(
+        "--json",
+        type=Path,
+        metavar="PATH",
+        help="save the report of the corpus run, to compare with other runs",
+    )
+    args = parser.parse_args()
+    benchmarks = args.benchmarks or _BENCHMARKS
+    for benchmark in set(benchmarks) - set(_BENCHMARKS):
+        parser.error(f"there is no benchmark {benchmark!r}")
+    if "line-lookup" in benchmarks:
+        bench_line_lookup(args.repeat)
+    if "corpus" in benchmarks:
+        shape = CorpusShape(**{name: getattr(args, name) for name in asdict(defaults)})
+        bench_corpus(shape, args.json)
+
+
+if __name__ == "__main__":
+    main()
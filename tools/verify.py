@@ -1,23 +1,56 @@
 #!python
 import asyncio
+import cProfile
+import hashlib
+import json
+import os
 import re
-from argparse import ArgumentParser
-from contextlib import closing
-from dataclasses import dataclass
-from functools import lru_cache
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from argparse import ArgumentParser, ArgumentTypeError
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from difflib import get_close_matches
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatch
+from functools import lru_cache, wraps
+from html import unescape
+from html.parser import HTMLParser
 from http import HTTPStatus
-from pathlib import Path
-from typing import Iterable, List, NewType, Optional, Sequence, Set, Tuple, TypeVar
+from pathlib import Path, PurePosixPath
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NewType,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import urlsplit, urlunsplit
 
-from aiohttp import ClientSession
+from aiohttp import ClientResponse, ClientSession, TCPConnector, TraceConfig
 from bs4 import BeautifulSoup
-from markdown import markdown
+from markdown import Markdown, markdown
+from markdown.util import AMP_SUBSTITUTE, AtomicString
 from pymdownx import slugs
-from tenacity import Retrying, stop_after_attempt
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential
 from tqdm.asyncio import tqdm
 
-Issue = NewType("Issue", str)
-TaggedIssue = Tuple[Path, Issue]
 Uri = NewType("Uri", str)
 HttpUri = NewType("HttpUri", Uri)
 T = TypeVar("T")
@@ -25,19 +58,599 @@ HtmlText = NewType("HtmlText", str)
 ExistingPath = NewType("ExistingPath", Path)
 TranslationsDir = NewType("TranslationsDir", ExistingPath)
 
+
+class Issue(str):
+    """
+    An issue as printed, which also tells which check found it and where, for
+    the machine-readable outputs.
+    """
+
+    rule_id: str
+    line: Optional[int]
+    column: Optional[int]
+    message: str  # without the location
+
+    def __new__(
+        cls,
+        text: str,
+        rule_id: str = "verify",
+        line: Optional[int] = None,
+        column: Optional[int] = None,
+        message: Optional[str] = None,
+    ) -> "Issue":
+        issue = super().__new__(cls, text)
+        issue.rule_id = rule_id
+        issue.line = line
+        issue.column = column
+        issue.message = text if message is None else message
+        return issue
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        :return: the arguments the issue is created again from
+        """
+        return {
+            "text": str(self),
+            "rule_id": self.rule_id,
+            "line": self.line,
+            "column": self.column,
+            "message": self.message,
+        }
+
+
+TaggedIssue = Tuple[Path, Issue]
+
 _TOOLS_DIR = Path(__file__).parent
 _REPO_ROOT = _TOOLS_DIR.parent
 _FAKE_DOCS_DIR = Path(__file__).parent / "fake-docs"
-_FAKE_DOCS = set(_FAKE_DOCS_DIR.rglob("**/*"))
 _LANGUAGES_DIR_NAME = "languages"
 _ROOT_LANGUAGES_DIR = _REPO_ROOT / _LANGUAGES_DIR_NAME
+_VERIFY_CACHE_DIR_NAME = ".verify_cache"
+_LINK_CACHE_FILE_NAME = "links.json"
+_FILE_RESULT_CACHE_FILE_NAME = "files.json"
+# written by the tools themselves, their files are neither docs nor changes
+_CACHE_DIR_NAMES = {".pytest_cache", _VERIFY_CACHE_DIR_NAME, ".schema_cache"}
+# never looked into by the docs, paths in them are looked up on the file system
+_PRUNED_DIR_NAMES = {".git"}
+
+
+@dataclass
+class PoolStats:
+    """
+    Counters of the run-scoped http client, used to see how well connections
+    are reused across all the probed links.
+    """
+
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        connections = self.connections_created + self.connections_reused
+        return self.connections_reused / connections if connections else 0.0
+
+
+@dataclass(frozen=True)
+class PathInfo:
+    is_dir: bool
+    size: int
+    mtime: float
+
+
+class TreeSnapshot:
+    """
+    Every path under a root directory with its size and modification time,
+    scanned once so that the path queries of a run are dictionary lookups.
+    Paths outside of the root (or without a root) are looked up on the file
+    system.
+    """
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = root
+        self._infos: Dict[str, PathInfo] = {}  # by absolute path
+        self._children: Dict[str, List[str]] = defaultdict(list)
+        self._pruned_dirs: Set[str] = set()
+        # not descended into, like pathlib's rglob, the paths under them are
+        # looked up on the file system
+        self._symlinked_dirs: Set[str] = set()
+        if root is not None:
+            self._scan(os.path.abspath(root))
+
+    def _scan(self, root: str) -> None:
+        self._infos[root] = PathInfo(is_dir=True, size=0, mtime=os.stat(root).st_mtime)
+        pending_dirs = [root]
+        while pending_dirs:
+            directory = pending_dirs.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name in _PRUNED_DIR_NAMES and entry.is_dir():
+                        self._pruned_dirs.add(entry.path)
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # a broken symlink does not exist
+                    is_dir = entry.is_dir()
+                    self._infos[entry.path] = PathInfo(is_dir, stat.st_size, stat.st_mtime)
+                    self._children[directory].append(entry.name)
+                    if is_dir and entry.is_symlink():
+                        self._symlinked_dirs.add(entry.path)
+                    elif is_dir:
+                        pending_dirs.append(entry.path)
+
+    def _covers(self, absolute_path: str) -> bool:
+        if self.root is None:
+            return False
+        root = os.path.abspath(self.root)
+        if absolute_path != root and not absolute_path.startswith(root + os.sep):
+            return False
+        if any(
+            absolute_path.startswith(symlinked + os.sep)
+            for symlinked in self._symlinked_dirs
+        ):
+            return False
+        return not any(
+            absolute_path == pruned or absolute_path.startswith(pruned + os.sep)
+            for pruned in self._pruned_dirs
+        )
+
+    def covers(self, path: Path) -> bool:
+        return self._covers(os.path.abspath(path))
+
+    def info(self, path: Path) -> Optional[PathInfo]:
+        absolute_path = os.path.abspath(path)
+        if self._covers(absolute_path):
+            return self._infos.get(absolute_path)
+        try:
+            stat = os.stat(absolute_path)
+        except OSError:
+            return None
+        return PathInfo(os.path.isdir(absolute_path), stat.st_size, stat.st_mtime)
+
+    def exists(self, path: Path) -> bool:
+        return self.info(path) is not None
+
+    def subdirectories(self, path: Path) -> List[Path]:
+        absolute_path = os.path.abspath(path)
+        if not self._covers(absolute_path):
+            return [child for child in path.glob("*") if child.is_dir()]
+        return [
+            path / name
+            for name in self._children.get(absolute_path, [])
+            if self._infos[os.path.join(absolute_path, name)].is_dir
+        ]
+
+    def files(self) -> Iterator[Path]:
+        """
+        :return: every file under the root, as paths joined to the given root
+        """
+        if self.root is None:
+            return
+        root = os.path.abspath(self.root)
+        for absolute_path, info in self._infos.items():
+            if not info.is_dir:
+                yield self.root / os.path.relpath(absolute_path, root)
+
+    def files_under(self, directory: Path) -> Set[Path]:
+        prefix = os.path.abspath(directory) + os.sep
+        return {
+            path for path in self.files() if os.path.abspath(path).startswith(prefix)
+        }
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class MemoryBoundedCache:
+    """
+    Memoizes the functions holding the large texts and trees of a run, evicting
+    the least recently used values of all of them once their (approximate)
+    total size goes over the budget. Unbounded when the budget is None.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.peak_bytes = 0
+        self.stats: Dict[str, CacheStats] = defaultdict(CacheStats)
+        self._entries: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        # the key of the latest version of a value, by its key without version
+        self._latest_keys: Dict[tuple, tuple] = {}
+        self._versioned_names: Set[str] = set()
+
+    def memoize(
+        self,
+        size_of: Callable[..., int],
+        version_of: Optional[Callable[..., Any]] = None,
+    ):
+        """
+        :param size_of: the size in bytes of a value, given the value and the
+            arguments it was computed from. The arguments, held by the key of
+            the value, are counted as well
+        :param version_of: given the arguments, a version of what else the value
+            is computed from, values of other versions are not reused and are
+            dropped once a new version is computed
+        """
+
+        def decorator(function):
+            name = function.__name__
+            if version_of is not None:
+                self._versioned_names.add(name)
+
+            @wraps(function)
+            def memoized(*args):
+                key = (name, *args)
+                if version_of is not None:
+                    unversioned_key, key = key, key + (version_of(*args),)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.stats[name].hits += 1
+                    return self._entries[key][0]
+                self.stats[name].misses += 1
+                value = function(*args)
+                if version_of is not None:
+                    # also drops the texts of saved files in the rendering
+                    # processes, which are not told what changed
+                    stale_key = self._latest_keys.get(unversioned_key)
+                    if stale_key in self._entries:
+                        self._drop(stale_key)
+                    self._latest_keys[unversioned_key] = key
+                key_size = sum(sys.getsizeof(arg) for arg in args)
+                self._store(key, value, size_of(value, *args) + key_size)
+                return value
+
+            memoized.cache_clear = lambda: self.clear(name)
+            memoized.forget = lambda predicate: self.forget(name, predicate)
+            return memoized
+
+        return decorator
+
+    def _store(self, key: tuple, value: Any, size: int) -> None:
+        self._entries[key] = (value, size)
+        self.current_bytes += size
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+        while self.max_bytes is not None and self.current_bytes > self.max_bytes:
+            (name, *_), (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.stats[name].evictions += 1
+
+    def forget(self, name: str, predicate: Callable[..., bool]) -> None:
+        """
+        Drops the values of the named function whose arguments (without the
+        version) match the predicate, and the values computed from them.
+        """
+        for key in [key for key in self._entries if key[0] == name]:
+            args = key[1:-1] if name in self._versioned_names else key[1:]
+            if key in self._entries and predicate(*args):
+                self._drop(key)
+
+    def _drop(self, key: tuple) -> None:
+        value, size = self._entries.pop(key)
+        self.current_bytes -= size
+        # e.g. the newline offsets of a dropped text, keyed by the text itself
+        dependent_keys = [
+            key for key in self._entries if any(arg is value for arg in key[1:])
+        ]
+        for dependent_key in dependent_keys:
+            if dependent_key in self._entries:
+                self._drop(dependent_key)
+
+    def clear(self, name: Optional[str] = None) -> None:
+        for key in [key for key in self._entries if name in (None, key[0])]:
+            self.current_bytes -= self._entries.pop(key)[1]
+
+
+_MEMORY_CACHE = MemoryBoundedCache()
+# measured on the specs, a parsed tree takes about 20 bytes per character of html
+_SOUP_BYTES_PER_HTML_CHAR = 20
+
+
+def _set_memory_cache_budget(max_bytes: Optional[int]) -> None:
+    # also the initializer of the rendering processes, each has its own cache
+    _MEMORY_CACHE.max_bytes = max_bytes
+
+
+@dataclass(frozen=True)
+class RenderedDoc:
+    """
+    What the link checks need from a rendered document, compact enough to be
+    cheaply sent back from a rendering process.
+    """
+
+    ids: FrozenSet[str]
+    uris: Tuple[Uri, ...]
+    undefined_bookmark_issues: Tuple[Issue, ...]
+    skips_links: bool
+    # wall and cpu seconds spent rendering, measured in the rendering process
+    render_seconds: Tuple[float, float] = field(default=(0.0, 0.0), compare=False)
+
+
+@dataclass
+class CachedProbe:
+    """
+    The outcome of probing an http uri as persisted between verify runs.
+    """
+
+    status: int
+    checked_at: float  # seconds since the epoch
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+LinkCache = Dict[HttpUri, CachedProbe]
+
+
+@dataclass
+class RecordedProbe:
+    """
+    What probing an http uri observed, as recorded into a cassette to replay
+    the link checks without network access.
+    """
+
+    status: Optional[int]  # None if the uri could not be accessed
+    seconds: float  # from the first request to the status, retries included
+    # the telling headers of the last response, see _RECORDED_HEADERS
+    headers: Dict[str, str] = field(default_factory=dict)
+    redirected_to: Optional[str] = None
+
+
+Cassette = Dict[HttpUri, RecordedProbe]
+
+
+@dataclass
+class CachedFileResult:
+    """
+    The outcome of the checks of a document that do not need the network, as
+    persisted between verify runs. It stays valid as long as the document, the
+    checks and every file the checks looked at are unchanged.
+    """
+
+    content_hash: str
+    rules_version: str
+    dependencies_hash: str
+    uris: List[Uri]
+    skips_links: bool
+    issues: List[Issue]
+
+    def __post_init__(self) -> None:
+        # loaded from json as the arguments of the issues
+        self.issues = [
+            issue if isinstance(issue, Issue) else Issue(**issue)
+            for issue in self.issues
+        ]
+
+
+FileResultCache = Dict[str, CachedFileResult]
+
+
+class ProbeScheduler:
+    """
+    Bounds the number of concurrent probes, both overall and per host, and lets
+    a host that asked us to back off (via Retry-After) rest before the next
+    request is sent to it, for at most max_defer_seconds.
+    """
+
+    def __init__(
+        self, max_concurrency: int, max_per_host: int, max_defer_seconds: float
+    ) -> None:
+        self._all_hosts = asyncio.Semaphore(max_concurrency)
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+        self._host_resume_times: Dict[str, float] = {}
+        self._max_defer_seconds = max_defer_seconds
+
+    def defer(self, host: str, seconds: float) -> None:
+        resume_time = time.monotonic() + min(seconds, self._max_defer_seconds)
+        self._host_resume_times[host] = max(
+            resume_time, self._host_resume_times.get(host, 0)
+        )
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        # waiting for the host, and for it to rest, before taking a global slot
+        # so a throttled host does not hold global slots
+        async with self._hosts[host]:
+            resume_time = self._host_resume_times.get(host, 0)
+            while time.monotonic() < resume_time:
+                await asyncio.sleep(resume_time - time.monotonic())
+                # deferred again while resting
+                resume_time = self._host_resume_times.get(host, 0)
+            async with self._all_hosts:
+                yield
+
+
+@dataclass
+class PhaseTime:
+    wall_seconds: float = 0.0
+    # None for phases awaiting other work, whose cpu time cannot be told apart
+    cpu_seconds: Optional[float] = None
+
+
+@dataclass
+class RunProfile:
+    """
+    Where the time of a run goes, collected with --profile: the phases of the
+    checks of every doc, the probes of every uri and the hit rates of the caches.
+    """
+
+    # posix path -> phase -> time
+    file_phases: Dict[str, Dict[str, PhaseTime]] = field(
+        default_factory=lambda: defaultdict(dict)
+    )
+    # normalized uri -> seconds from the first request to the status, waits included
+    uri_seconds: Dict[str, float] = field(default_factory=dict)
+    # host -> the seconds of every request sent to it
+    host_request_seconds: Dict[str, List[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    caches: Dict[str, CacheStats] = field(
+        default_factory=lambda: defaultdict(CacheStats)
+    )
+
+
+class IssueWriter(ABC):
+    """
+    Streams the issues of every doc to a file as soon as the doc is verified,
+    in a format dashboards ingest without parsing the printed issues.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.stream: TextIO = path.open("w", encoding="utf-8")
+
+    @abstractmethod
+    def write(self, tagged_issues: Sequence[TaggedIssue]) -> None:
+        """
+        Writes the issues of a verified doc, all of them tagged with its path.
+        """
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def _issue_record(path: Path, issue: Issue) -> Dict[str, Any]:
+    return {
+        "path": path.as_posix(),
+        "line": issue.line,
+        "column": issue.column,
+        "rule": issue.rule_id,
+        "message": issue.message,
+    }
+
+
+class JsonLinesIssueWriter(IssueWriter):
+    def write(self, tagged_issues: Sequence[TaggedIssue]) -> None:
+        for path, issue in tagged_issues:
+            self.stream.write(json.dumps(_issue_record(path, issue)) + "\n")
+        self.stream.flush()
+
+
+def _sarif_result(path: Path, issue: Issue) -> Dict[str, Any]:
+    physical_location: Dict[str, Any] = {"artifactLocation": {"uri": path.as_posix()}}
+    if issue.line is not None:
+        region = {"startLine": issue.line}
+        if issue.column is not None:
+            region["startColumn"] = issue.column
+        physical_location["region"] = region
+    return {
+        "ruleId": issue.rule_id,
+        "level": "error",
+        "message": {"text": issue.message},
+        "locations": [{"physicalLocation": physical_location}],
+    }
+
+
+class SarifIssueWriter(IssueWriter):
+    """
+    Writes the results as they come and the rest of the log when closed, the
+    file is a valid SARIF 2.1.0 log once the run is over.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.rule_ids: Set[str] = set()
+        self.stream.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            '"runs": [{"results": [\n'
+        )
+
+    def write(self, tagged_issues: Sequence[TaggedIssue]) -> None:
+        for path, issue in tagged_issues:
+            separator = ",\n" if self.rule_ids else ""
+            self.stream.write(separator + json.dumps(_sarif_result(path, issue)))
+            self.rule_ids.add(issue.rule_id)
+        self.stream.flush()
+
+    def close(self) -> None:
+        driver = {
+            "name": "verify",
+            "rules": [{"id": rule_id} for rule_id in sorted(self.rule_ids)],
+        }
+        self.stream.write(f"\n], \"tool\": {json.dumps({'driver': driver})}}}]}}\n")
+        super().close()
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    One of the parts a run is split into, to verify the docs on several CI
+    nodes at the same time. Written (and parsed) as INDEX/COUNT, from 1/COUNT.
+    """
+
+    index: int  # from 0
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index + 1}/{self.count}"
 
 
 @dataclass
 class Settings:
     excluded_paths: Set[Path]
+    # scanned by _directory_issues if it does not cover the verified directory
+    tree: TreeSnapshot = field(default_factory=TreeSnapshot, repr=False)
     http_max_get_attemps: int = 5
     http_timeout_seconds: int = 10
+    http_max_connections: int = 100
+    http_keepalive_seconds: int = 30
+    http_dns_cache_seconds: int = 300
+    http_max_concurrency: int = 32
+    http_max_per_host: int = 4
+    http_backoff_base_seconds: float = 0.5
+    http_backoff_max_seconds: float = 30
+    # shared by every probe of the run, opened by _directory_issues if not given
+    http_session: Optional[ClientSession] = field(default=None, repr=False)
+    pool_stats: PoolStats = field(default_factory=PoolStats)
+    # None disables the persistent link cache
+    link_cache: Optional[LinkCache] = field(default=None, repr=False)
+    link_cache_max_age_seconds: int = 24 * 60 * 60
+    # None disables the persistent cache of the local checks, keyed by posix path
+    file_result_cache: Optional[FileResultCache] = field(default=None, repr=False)
+    # when given, only docs among these (absolute) paths, or looking into them,
+    # are verified
+    changed_paths: Optional[Set[Path]] = field(default=None, repr=False)
+    # every path looked into by the local checks -> the docs looking into it,
+    # filled by _directory_issues when only the changed docs are verified
+    link_graph: Dict[Path, Set[Path]] = field(default_factory=dict, repr=False)
+    # markdown is rendered by this many processes, rendering inline if 1 or less
+    render_processes: int = os.cpu_count() or 1
+    render_executor: Optional[Executor] = field(default=None, repr=False)
+    # extract links and ids with BeautifulSoup instead of the streaming parser
+    use_beautifulsoup: bool = False
+    # read the links and ids of the markdown docs without html when possible,
+    # see _markdown_links_and_ids
+    use_markdown_fast_path: bool = True
+    # budget of the texts and trees held in memory, None for unbounded
+    memory_cache_max_bytes: Optional[int] = None
+    # None verifies all the docs concurrently
+    max_files_in_flight: Optional[int] = None
+    # when given, only the local checks of the docs of this shard, and the
+    # probes of the uris of this shard, are run
+    shard: Optional[Shard] = None
+    # None disables the instrumentation of the run
+    profile: Optional[RunProfile] = field(default=None, repr=False)
+    # probes are replayed from the cassette instead of being sent, unless
+    # recording, which sends every probe (fresh cached ones too) into it
+    cassette: Optional[Cassette] = field(default=None, repr=False)
+    records_cassette: bool = False
+    # given the issues of every doc as soon as it is verified
+    issue_writers: List[IssueWriter] = field(default_factory=list, repr=False)
+    # pending and finished renders of the run, keyed by normalized path
+    renders: Dict[Path, "asyncio.Future[RenderedDoc]"] = field(
+        default_factory=dict, repr=False
+    )
+    # created on the first probe of the run, see _probe_scheduler
+    probe_scheduler: Optional[ProbeScheduler] = field(default=None, repr=False)
+    # in-flight and finished probes of the run, keyed by _normalized_uri
+    uri_probes: Dict[HttpUri, "asyncio.Future[Optional[int]]"] = field(
+        default_factory=dict, repr=False
+    )
 
 
 _SKIP_TEXT_PATTERN = re.compile(
@@ -76,25 +689,159 @@ def _is_text_all_uppercase(text: str) -> bool:
     return text == text.upper()
 
 
-def _banned_phrase_issues(text: str) -> Iterable[Issue]:
-    for match in _BANNED_PHRASES_PATTERN.finditer(text):
-        yield _pattern_issue(match, text, f"{repr(match.group(0))} is banned")
+@dataclass(frozen=True)
+class TextRule:
+    """
+    A check of the plain text of a document. The patterns of all the rules are
+    combined into a single scanner, so adding a rule does not add a pass.
+    """
+
+    id: str
+    pattern: re.Pattern  # flags are given to re.compile, not inlined in the pattern
+    # a regex character class of the characters a match can start with, lets the
+    # scanner skip offsets quickly. None for rules that only match at line starts
+    first_chars: Optional[str]
+    # the issue message of a match, None if the match turns out to be fine
+    message: Callable[[re.Match], Optional[str]]
+    # globs of the docs the rule checks, as matched by PurePath.match against
+    # their path from the verified root, so "/core/*.md" only matches the docs
+    # directly in core/ and "*.md" every markdown doc. None for every doc
+    paths: Optional[Tuple[str, ...]] = None
+    # whether docs marked with <!-- no verify specs --> are left unchecked
+    skippable: bool = True
+
+    def checks(self, relative_path: Optional[PurePosixPath]) -> bool:
+        if self.paths is None or relative_path is None:
+            return True
+        anchored_path = PurePosixPath("/", relative_path)
+        return any(anchored_path.match(pattern) for pattern in self.paths)
+
+
+_TEXT_RULES: List[TextRule] = []
+
+
+def _text_rule(
+    id: str,
+    pattern: re.Pattern,
+    first_chars: Optional[str],
+    paths: Optional[Tuple[str, ...]] = None,
+    skippable: bool = True,
+):
+    def register(message: Callable[[re.Match], Optional[str]]):
+        _TEXT_RULES.append(
+            TextRule(id, pattern, first_chars, message, paths, skippable)
+        )
+        return message
 
-def _capital_dash_issues(text: str) -> Iterable[Issue]:
-    for match in _CAPITAL_DASH_PATTERN.finditer(text):
-        yield _pattern_issue(match, text, f"{repr(match.group(2))} should start with a capital letter after the dash")
+    return register
 
 
-def _miscased_phrase_issues(text: str) -> Iterable[Issue]:
-    # text = _remove_between(text)
-    for match in _PHRASES_THAT_MUST_BE_CAPITALIZED_PATTERN.finditer(text):
-        phrase = match.group(0)
-        if not _is_text_all_uppercase(phrase):
-            yield _pattern_issue(
-                match,
-                text,
-                f"{repr(phrase)} MUST be capitalized ({repr(phrase.upper())})",
-            )
+@_text_rule("banned-phrase", _BANNED_PHRASES_PATTERN, "c")
+def _banned_phrase_message(match: re.Match) -> Optional[str]:
+    return f"{repr(match.group(0))} is banned"
+
+
+@_text_rule("capital-dash", _CAPITAL_DASH_PATTERN, r"\s-")
+def _capital_dash_message(match: re.Match) -> Optional[str]:
+    return f"{repr(match.group(2))} should start with a capital letter after the dash"
+
+
+@_text_rule("miscased-phrase", _PHRASES_THAT_MUST_BE_CAPITALIZED_PATTERN, "mrso")
+def _miscased_phrase_message(match: re.Match) -> Optional[str]:
+    phrase = match.group(0)
+    if _is_text_all_uppercase(phrase):
+        return None
+    return f"{repr(phrase)} MUST be capitalized ({repr(phrase.upper())})"
+
+
+# the format rules keep the scope of the grep passes of the Makefile they
+# replaced: markdown docs only, marked with <!-- no verify specs --> or not
+@_text_rule("tab", re.compile(r"\t+"), r"\t", paths=("*.md",), skippable=False)
+def _tab_message(match: re.Match) -> Optional[str]:
+    return "Tabs are not allowed"
+
+
+@_text_rule(
+    "trailing-space",
+    re.compile(r" +$", flags=re.MULTILINE),
+    " ",
+    paths=("*.md",),
+    skippable=False,
+)
+def _trailing_space_message(match: re.Match) -> Optional[str]:
+    return "Extra spaces at the end of the line"
+
+
+@_text_rule(
+    "slash-hash-href", re.compile(r"/#"), "/", paths=("*.md",), skippable=False
+)
+def _slash_hash_href_message(match: re.Match) -> Optional[str]:
+    return f"{repr(match.group(0))} found, hrefs to a segment must not end with a '/'"
+
+
+@_text_rule(
+    "uneven-backticks",
+    re.compile(r"^[^`\n]*`[^`\n]*$", flags=re.MULTILINE),
+    None,
+    paths=("/core/*.md", "/workingdrafts/bindings/*.md"),
+    skippable=False,
+)
+def _uneven_backticks_message(match: re.Match) -> Optional[str]:
+    return "Uneven back-ticks"
+
+
+_INLINE_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x"}
+
+
+def _scoped_pattern(pattern: re.Pattern) -> str:
+    flags = "".join(
+        letter for flag, letter in _INLINE_FLAGS.items() if pattern.flags & flag
+    )
+    return f"(?{flags}:{pattern.pattern})" if flags else f"(?:{pattern.pattern})"
+
+
+@lru_cache
+def _text_rules_scanner(rules: Tuple[TextRule, ...]) -> re.Pattern:
+    """
+    One alternation of zero-width lookaheads, one per rule, matching at every
+    offset where at least one of the rules matches. The group of the first
+    such rule is named after its index.
+    """
+    first_chars = "|".join(
+        _scoped_pattern(re.compile(f"[{rule.first_chars}]", rule.pattern.flags))
+        for rule in rules
+        if rule.first_chars is not None
+    )
+    rules_alternation = "|".join(
+        f"(?=(?P<rule{index}>{_scoped_pattern(rule.pattern)}))"
+        for index, rule in enumerate(rules)
+    )
+    # the engine cannot optimize an alternation of lookaheads, ruling out most
+    # offsets with a single character check is what makes one pass worth it
+    return re.compile(f"(?:(?m:^)|(?={first_chars}))(?:{rules_alternation})")
+
+
+def _text_rule_issues(
+    text: str, rules: Sequence[TextRule] = _TEXT_RULES
+) -> Iterable[Issue]:
+    rules = tuple(rules)
+    # like finditer, a rule does not match again inside its own previous match
+    match_ends = [0] * len(rules)
+    for hit in _text_rules_scanner(rules).finditer(text):
+        offset = hit.start()
+        # rules before the first hit rule do not match at this offset, later
+        # rules still might
+        for index in range(int(hit.lastgroup[len("rule"):]), len(rules)):
+            if offset < match_ends[index]:
+                continue
+            match = rules[index].pattern.match(text, offset)
+            if match is None:
+                continue
+            match_ends[index] = max(match.end(), offset + 1)
+            message = rules[index].message(match)
+            if message is not None:
+                yield _pattern_issue(match, text, message, rules[index].id)
+
 
 def _remove_between(text):
     lines = text.split('\n')
@@ -116,36 +863,75 @@ def _should_skip_plain_text_issues(text: str) -> bool:
     return _skip_type(text) == "specs"
 
 
-def _plain_text_issues(text: str) -> Iterable[Issue]:
-    if not _should_skip_plain_text_issues(text):
-        yield from _banned_phrase_issues(text)
-        yield from _capital_dash_issues(text)
-        yield from _miscased_phrase_issues(text)
+def _plain_text_issues(
+    text: str, relative_path: Optional[PurePosixPath] = None
+) -> Iterable[Issue]:
+    """
+    :param relative_path: the path of the doc from the verified root, None to
+        check the text with every rule, whatever docs they check
+    """
+    skips_specs = _should_skip_plain_text_issues(text)
+    rules = [
+        rule
+        for rule in _TEXT_RULES
+        if rule.checks(relative_path) and not (skips_specs and rule.skippable)
+    ]
+    if rules:
+        yield from _text_rule_issues(text, rules)
+
+
+# the int objects of the offsets are 28 bytes each
+@_MEMORY_CACHE.memoize(
+    size_of=lambda offsets, text: sys.getsizeof(offsets) + 28 * len(offsets)
+)
+def _newline_offsets(text: str) -> Sequence[int]:
+    """
+    The sorted offsets of every newline in the text, built once per text so
+    that line lookups are a binary search.
+    """
+    return [match.start() for match in _NEWLINE_PATTERN.finditer(text)]
 
 
 def _line_of_match(match: re.Match, origin_text: str) -> int:
     return (
         #  count all newlines in the text before the given match
-        len(_NEWLINE_PATTERN.findall(origin_text, 0, match.start(0)))
+        bisect_left(_newline_offsets(origin_text), match.start(0))
         + 1  # adding one because line count starts from 1 and not 0
     )
 
 
-def _pattern_issue(match: re.Match, origin_text: str, issue_message: str) -> Issue:
-    return Issue(f"line {_line_of_match(match, origin_text)}: {issue_message}")
+def _column_of_match(match: re.Match, origin_text: str) -> int:
+    newline_offsets = _newline_offsets(origin_text)
+    line_index = bisect_left(newline_offsets, match.start(0))
+    line_start = newline_offsets[line_index - 1] + 1 if line_index else 0
+    return match.start(0) - line_start + 1  # columns count from 1 as well
 
 
-@lru_cache
+def _pattern_issue(
+    match: re.Match, origin_text: str, issue_message: str, rule_id: str
+) -> Issue:
+    line = _line_of_match(match, origin_text)
+    return Issue(
+        f"line {line}: {issue_message}",
+        rule_id=rule_id,
+        line=line,
+        column=_column_of_match(match, origin_text),
+        message=issue_message,
+    )
+
+
+@_MEMORY_CACHE.memoize(size_of=lambda soup, html: _SOUP_BYTES_PER_HTML_CHAR * len(html))
 def _html_parser(html: str) -> BeautifulSoup:
     return BeautifulSoup(html, "html.parser")
 
 
-def _all_docs(directory: Path, excluded_paths: Set[Path]) -> Set[ExistingPath]:
+def _all_docs(tree: TreeSnapshot, excluded_paths: Set[Path]) -> Set[ExistingPath]:
     excluded_paths = {path.absolute() for path in excluded_paths}
     return {
         ExistingPath(path)
-        for path in set(directory.rglob("**/*.md")) | set(directory.rglob("**/*.htm*"))
-        if path.absolute() not in excluded_paths
+        for path in tree.files()
+        if (fnmatch(path.name, "*.md") or fnmatch(path.name, "*.htm*"))
+        and path.absolute() not in excluded_paths
     }
 
 
@@ -162,94 +948,473 @@ def _find_all_uris(html: HtmlText) -> Iterable[Uri]:
         if uri:
             yield Uri(uri.strip())
 
+
+def _find_all_ids(html: HtmlText) -> FrozenSet[str]:
+    return frozenset(element["id"] for element in _html_parser(html).find_all(id=True))
+
+
+class _LinksAndIdsExtractor(HTMLParser):
+    """
+    Collects the hrefs of the anchors and the ids of all the elements while
+    the html is parsed, without building a tree.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.uris: List[Uri] = []
+        self.ids: Set[str] = set()
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)  # like BeautifulSoup, the last duplicate wins
+        if attributes.get("id") is not None:
+            self.ids.add(attributes["id"])
+        if tag == "a" and attributes.get("href"):
+            self.uris.append(Uri(attributes["href"].strip()))
+
+
+def _extract_uris_and_ids(
+    html: HtmlText, use_beautifulsoup: bool = False
+) -> Tuple[Tuple[Uri, ...], FrozenSet[str]]:
+    if use_beautifulsoup:  # the former implementation, kept for parity checks
+        return tuple(_find_all_uris(html)), _find_all_ids(html)
+    extractor = _LinksAndIdsExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return tuple(extractor.uris), frozenset(extractor.ids)
+
 _LINK_PROBE_HEADERS = {
     "Accept": "text/html, application/json, application/xml",
     "User-Agent": "xregistry-tooling",
 }
 
-async def _uri_availability_issues(uri: HttpUri, settings: Settings) -> Sequence[Issue]:
-    if "example.com"  in uri: return []
-    if "ietf.org"     in uri: return []
-    if "rfc-edit.org" in uri: return []
 
+def _pool_trace_config(stats: PoolStats) -> TraceConfig:
+    def counter(name: str):
+        async def count(session, context, params) -> None:
+            setattr(stats, name, getattr(stats, name) + 1)
+
+        return count
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(counter("requests"))
+    trace_config.on_connection_create_end.append(counter("connections_created"))
+    trace_config.on_connection_reuseconn.append(counter("connections_reused"))
+    trace_config.on_dns_cache_hit.append(counter("dns_cache_hits"))
+    trace_config.on_dns_cache_miss.append(counter("dns_cache_misses"))
+    return trace_config
+
+
+@asynccontextmanager
+async def _pooled_http_session(settings: Settings) -> AsyncIterator[ClientSession]:
+    connector = TCPConnector(
+        limit=settings.http_max_connections,
+        keepalive_timeout=settings.http_keepalive_seconds,
+        ttl_dns_cache=settings.http_dns_cache_seconds,
+        ssl=False,
+    )
+    async with ClientSession(
+        connector=connector,
+        headers=_LINK_PROBE_HEADERS,
+        trace_configs=[_pool_trace_config(settings.pool_stats)],
+    ) as session:
+        yield session
+
+
+def _normalized_uri(uri: HttpUri) -> HttpUri:
+    """
+    The key under which probes of the same http target are shared. The fragment
+    is never sent to the server, and scheme and host are case-insensitive.
+    """
+    parts = urlsplit(uri)
+    return HttpUri(
+        Uri(
+            urlunsplit(
+                (
+                    parts.scheme.lower(),
+                    parts.netloc.lower(),
+                    parts.path or "/",
+                    parts.query,
+                    "",
+                )
+            )
+        )
+    )
+
+
+def _load_cache(path: Path, entry_type: Callable[..., T]) -> Dict[str, T]:
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        return {key: entry_type(**entry) for key, entry in entries.items()}
+    except (OSError, ValueError, TypeError):
+        return {}  # a missing or corrupted cache is as good as an empty one
+
+
+def _jsonable(value: Any) -> Any:
+    # json would write issues as bare strings, losing where they were found
+    match value:
+        case Issue():
+            return value.as_dict()
+        case list() | tuple():
+            return [_jsonable(item) for item in value]
+        case dict():
+            return {key: _jsonable(item) for key, item in value.items()}
+        case _:
+            return value
+
+
+def _save_cache(path: Path, entries: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(".tmp")
+    temporary_path.write_text(
+        json.dumps(
+            {
+                key: _jsonable(asdict(entry))
+                for key, entry in sorted(entries.items())
+            },
+            indent=1,
+        ),
+        encoding="utf-8",
+    )
+    temporary_path.replace(path)
+
+
+def _load_link_cache(path: Path) -> LinkCache:
+    return _load_cache(path, CachedProbe)
+
+
+def _save_link_cache(path: Path, link_cache: LinkCache) -> None:
+    _save_cache(path, link_cache)
+
+
+def _is_fresh(probe: CachedProbe, settings: Settings) -> bool:
+    return time.time() - probe.checked_at < settings.link_cache_max_age_seconds
+
+
+def _is_cacheable_status(status: int) -> bool:
+    # rate limits and server errors are transient, they must be probed again
+    return status != HTTPStatus.TOO_MANY_REQUESTS and status < 500
+
+
+def _revalidation_headers(probe: Optional[CachedProbe]) -> Dict[str, str]:
+    headers = {}
+    if probe is not None and probe.etag:
+        headers["If-None-Match"] = probe.etag
+    if probe is not None and probe.last_modified:
+        headers["If-Modified-Since"] = probe.last_modified
+    return headers
+
+
+_RETRYABLE_STATUSES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int, retry_after_seconds: Optional[float]) -> None:
+        super().__init__(f"http status {status}")
+        self.status = status
+        self.retry_after_seconds = retry_after_seconds
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    :param value: a Retry-After header, either delta-seconds or an http date
+    """
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(settings: Settings):
+    jittered_exponential = wait_random_exponential(
+        multiplier=settings.http_backoff_base_seconds,
+        max=settings.http_backoff_max_seconds,
+    )
+
+    def wait(retry_state) -> float:
+        error = retry_state.outcome.exception()
+        if isinstance(error, _RetryableStatus) and error.retry_after_seconds is not None:
+            return min(error.retry_after_seconds, settings.http_backoff_max_seconds)
+        return jittered_exponential(retry_state)
+
+    return wait
+
+
+@asynccontextmanager
+async def _timed_request(
+    host: str, profile: Optional[RunProfile]
+) -> AsyncIterator[None]:
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.host_request_seconds[host].append(time.perf_counter() - start_time)
+
+
+@contextmanager
+def _timed_phase(
+    profile: Optional[RunProfile], path: Path, phase: str, measures_cpu: bool = True
+) -> Iterator[None]:
+    """
+    :param measures_cpu: False for phases awaiting other work, as the process
+        time then includes the work of other docs
+    """
+    if profile is None:
+        yield
+        return
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        profile.file_phases[path.as_posix()][phase] = PhaseTime(
+            wall_seconds=time.perf_counter() - wall_start,
+            cpu_seconds=time.process_time() - cpu_start if measures_cpu else None,
+        )
+
+
+def _probe_scheduler(settings: Settings) -> ProbeScheduler:
+    if settings.probe_scheduler is None:
+        settings.probe_scheduler = ProbeScheduler(
+            settings.http_max_concurrency,
+            settings.http_max_per_host,
+            settings.http_backoff_max_seconds,
+        )
+    return settings.probe_scheduler
+
+
+_RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Location", "Retry-After")
+
+
+def _replays_cassette(settings: Settings) -> bool:
+    return settings.cassette is not None and not settings.records_cassette
+
+
+def _recorded_probe(
+    status: Optional[int], response: Optional[ClientResponse], seconds: float
+) -> RecordedProbe:
+    if response is None:
+        return RecordedProbe(status=status, seconds=round(seconds, 3))
+    return RecordedProbe(
+        status=status,
+        seconds=round(seconds, 3),
+        headers={
+            name: response.headers[name]
+            for name in _RECORDED_HEADERS
+            if name in response.headers
+        },
+        redirected_to=str(response.url) if response.history else None,
+    )
+
+
+async def _probe_status(uri: HttpUri, settings: Settings) -> Optional[int]:
+    """
+    :return: the http status of the given uri, or None if it could not be accessed
+    """
+    if _replays_cassette(settings):
+        recorded = settings.cassette.get(uri)
+        return None if recorded is None else recorded.status
+    link_cache = None if settings.records_cassette else settings.link_cache
+    cached = None if link_cache is None else link_cache.get(uri)
+    profile = settings.profile
+    if cached is not None and _is_fresh(cached, settings):
+        if profile is not None:
+            profile.caches["links"].hits += 1
+        return cached.status
+    if profile is not None:
+        profile.caches["links"].misses += 1
+    host = urlsplit(uri).netloc
+    scheduler = _probe_scheduler(settings)
+    start_time = time.perf_counter()
+    status: Optional[int] = None
+    response: Optional[ClientResponse] = None
     try:
-        for attempt in Retrying(stop=stop_after_attempt(settings.http_max_get_attemps)):
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(settings.http_max_get_attemps),
+            wait=_backoff(settings),
+            reraise=True,
+        ):
             with attempt:
-                async with ClientSession() as session:
-                    with closing(
-                        await session.get(
-                            uri,
-                            headers=_LINK_PROBE_HEADERS,
-                            timeout=settings.http_timeout_seconds,
-                            ssl=False,
-                            max_field_size=81900
+                async with scheduler.slot(host), _timed_request(
+                    host, profile
+                ), settings.http_session.get(
+                    uri,
+                    headers=_revalidation_headers(cached),
+                    timeout=settings.http_timeout_seconds,
+                    max_field_size=81900,
+                ) as response:
+                    # drain the body so the connection goes back to the pool
+                    await response.read()
+                    status = response.status
+                    if status in _RETRYABLE_STATUSES:
+                        retry_after = _retry_after_seconds(
+                            response.headers.get("Retry-After")
                         )
-                    ) as response:
-                        match response.status:
-                            case HTTPStatus.NOT_FOUND:
-                                return [Issue(f"{repr(uri)} was not found")]
-                            case _:
-                                return []  # no issues
-
+                        if retry_after is not None:
+                            scheduler.defer(host, retry_after)
+                        raise _RetryableStatus(status, retry_after)
+                    if status == HTTPStatus.NOT_MODIFIED and cached is not None:
+                        if profile is not None:
+                            profile.caches["link-revalidations"].hits += 1
+                        status = cached.status
+                    elif cached is not None and profile is not None:
+                        profile.caches["link-revalidations"].misses += 1
+                    if settings.link_cache is not None and _is_cacheable_status(status):
+                        settings.link_cache[uri] = CachedProbe(
+                            status=status,
+                            checked_at=time.time(),
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified"),
+                        )
+                    return status
+    except _RetryableStatus as error:
+        status = error.status  # still throttled or unavailable after every attempt
+        return status
     except Exception:  # noqa
-        return [Issue(f"Could Not access {repr(uri)}")]
-    else:
-        return []
+        status = None
+        return status
+    finally:
+        seconds = time.perf_counter() - start_time
+        if profile is not None:
+            profile.uri_seconds[uri] = seconds
+        if settings.records_cassette:
+            settings.cassette[uri] = _recorded_probe(status, response, seconds)
+
+
+def _shared_probe_status(
+    uri: HttpUri, settings: Settings
+) -> "asyncio.Future[Optional[int]]":
+    """
+    Every distinct http target is probed at most once per run, all the files
+    referencing it await the same (possibly still in-flight) probe.
+    """
+    key = _normalized_uri(uri)
+    if key not in settings.uri_probes:
+        settings.uri_probes[key] = asyncio.ensure_future(_probe_status(key, settings))
+    return settings.uri_probes[key]
+
+
+async def _uri_availability_issues(uri: HttpUri, settings: Settings) -> Sequence[Issue]:
+    if "example.com"  in uri: return []
+    if "ietf.org"     in uri: return []
+    if "rfc-edit.org" in uri: return []
 
+    if _replays_cassette(settings) and _normalized_uri(uri) not in settings.cassette:
+        return [
+            Issue(
+                f"{repr(uri)} is not in the cassette, record it again",
+                rule_id="unrecorded-link",
+            )
+        ]
+    match await _shared_probe_status(uri, settings):
+        case None:
+            return [Issue(f"Could Not access {repr(uri)}", rule_id="unreachable-link")]
+        case HTTPStatus.NOT_FOUND:
+            return [Issue(f"{repr(uri)} was not found", rule_id="link-not-found")]
+        case _:
+            return []  # no issues
 
-def _does_html_contains_id(html: str, id: str) -> bool:
-    html = _html_parser(html)
 
-    if html.find(id=id) is not None: return True
+def _rendered_doc(path: Path, settings: Settings) -> "asyncio.Future[RenderedDoc]":
+    """
+    Every document is rendered once per run, off the event loop when a render
+    executor is available, so rendering overlaps with the http probes.
+    """
+    key = Path(os.path.normpath(path))
+    if key not in settings.renders:
+        if settings.render_executor is None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(
+                _render_doc(
+                    key, settings.use_beautifulsoup, settings.use_markdown_fast_path
+                )
+            )
+        else:
+            future = asyncio.get_running_loop().run_in_executor(
+                settings.render_executor,
+                _render_doc,
+                key,
+                settings.use_beautifulsoup,
+                settings.use_markdown_fast_path,
+            )
+        settings.renders[key] = future
+    return settings.renders[key]
 
-    elements_with_ids = html.find_all(id=True)
-    id_list = [element['id'] for element in elements_with_ids]
-    print("\nVALID IDs:\n")
-    print(*sorted(id_list), sep="\n")
 
-    return False
+def _closest_id(ids: Iterable[str], id: str) -> Optional[str]:
+    return next(iter(get_close_matches(id, ids, n=1)), None)
 
 
-def _missing_segment_issue(path: Path, segment: str) -> Issue:
-    return Issue(f"{path.as_posix()} does not contain {repr('#' + segment)} segment")
+def _missing_segment_issue(
+    path: Path, segment: str, suggestion: Optional[str] = None
+) -> Issue:
+    issue = f"{path.as_posix()} does not contain {repr('#' + segment)} segment"
+    if suggestion is not None:
+        issue += f" (did you mean {repr('#' + suggestion)}?)"
+    return Issue(issue, rule_id="missing-segment")
 
 
 def _missing_file_issue(path: Path) -> Issue:
-    return Issue(f"{path.as_posix()} does not exist")
+    return Issue(f"{path.as_posix()} does not exist", rule_id="missing-file")
 
 
-def _local_path_uri_issues(uri: Uri, current_path: Path) -> Sequence[Issue]:
-    path: Optional[Path] = None
-    path_segment: Optional[str] = None
-
+def _local_uri_target(
+    uri: Uri, current_path: Path
+) -> Optional[Tuple[Path, Optional[str]]]:
+    """
+    :return: the referenced path and segment, None if the uri is invalid
+    """
     match uri.split("#"):
         case ["", segment]:
-            path = current_path
-            path_segment = segment
+            return current_path, segment
         case [relative_path, segment]:
-            path = current_path.parent / relative_path
-            path_segment = segment
+            return current_path.parent / relative_path, segment
         case [relative_path]:
-            path = current_path.parent / relative_path
+            return current_path.parent / relative_path, None
         case _:
-            return [Issue("Invalid local path uri: " + uri)]
+            return None
+
+
+async def _local_path_uri_issues(
+    uri: Uri, current_path: Path, settings: Settings
+) -> Sequence[Issue]:
+    target = _local_uri_target(uri, current_path)
+    if target is None:
+        return [Issue("Invalid local path uri: " + uri, rule_id="invalid-local-uri")]
+    path, path_segment = target
+
+    if not settings.tree.exists(path):
+        return [_missing_file_issue(path)]
+    if not path_segment:
+        return []
+    ids = (await _rendered_doc(path, settings)).ids
+    if path_segment not in ids:
+        # the suggestion is only worth computing for the (rare) misses
+        suggestion = _closest_id(ids, path_segment)
+        return [_missing_segment_issue(path, path_segment, suggestion)]
+    return []
+
+
+def _uri_schema(uri: Uri) -> str:
+    return uri.split(":")[0].lower()
+
 
-    if not path.exists():
-        return [_missing_file_issue(path)]
-    if path_segment and not _does_html_contains_id(read_html_text(path), path_segment):
-        return [_missing_segment_issue(path, path_segment)]
-    return []
+def _is_http_uri(uri: Uri) -> bool:
+    return _uri_schema(uri) in ("http", "https")
 
 
-async def _uri_issues(uri: Uri, path: Path, settings: Settings) -> Sequence[Issue]:
-    schema = uri.split(":")[0]
-    match schema:
-        case "http" | "https":
-            return await _uri_availability_issues(HttpUri(uri), settings)
-        case "mailto":
-            return []  # mail URIs cannot have issues
-        case _:  # assuming it is a local path markdown reference
-            return _local_path_uri_issues(uri, path)
+def _is_local_uri(uri: Uri) -> bool:
+    # mail URIs cannot have issues, anything else is assumed to be a local path
+    # markdown reference
+    return not _is_http_uri(uri) and _uri_schema(uri) != "mailto"
 
 
 def _undefined_bookmark_issues(html: HtmlText) -> Iterable[Issue]:
@@ -263,6 +1428,7 @@ def _undefined_bookmark_issues(html: HtmlText) -> Iterable[Issue]:
             match,
             html,
             f"Undefined markdown bookmark referenced ({repr(match.group(0))})",
+            rule_id="undefined-bookmark",
         )
 
 
@@ -274,17 +1440,128 @@ def _should_skip_html_issues(html: HtmlText) -> bool:
     return _skip_type(html) == "links"
 
 
-async def _html_issues(path: Path, settings: Settings) -> Iterable[Issue]:
-    html = read_html_text(path)
+async def _local_link_issues(path: Path, settings: Settings) -> Iterable[Issue]:
+    doc = await _rendered_doc(path, settings)
 
-    if _should_skip_html_issues(html):
+    if doc.skips_links:
         return []
 
     return _flatten(
         await asyncio.gather(
-            *[_uri_issues(uri, path, settings) for uri in _find_all_uris(html)]
+            *[
+                _local_path_uri_issues(uri, path, settings)
+                for uri in doc.uris
+                if _is_local_uri(uri)
+            ]
+        )
+    ) + list(doc.undefined_bookmark_issues)
+
+
+async def _http_link_issues(
+    uris: Iterable[Uri], settings: Settings
+) -> Iterable[Issue]:
+    return _flatten(
+        await asyncio.gather(
+            *[
+                _uri_availability_issues(HttpUri(uri), settings)
+                for uri in uris
+                if _is_http_uri(uri)
+            ]
+        )
+    )
+
+
+def _print_pool_stats(stats: PoolStats) -> None:
+    print(
+        f"HTTP pool: {stats.requests} requests, "
+        f"{stats.connections_created} connections opened, "
+        f"{stats.connections_reused} reused ({stats.reuse_ratio:.0%} reuse), "
+        f"DNS cache {stats.dns_cache_hits} hits / {stats.dns_cache_misses} misses"
+    )
+
+
+def _print_memory_cache_stats(cache: MemoryBoundedCache) -> None:
+    print(
+        "Memory cache: "
+        + ", ".join(
+            f"{name} {stats.hits} hits / {stats.misses} misses / "
+            f"{stats.evictions} evictions"
+            for name, stats in sorted(cache.stats.items())
         )
-    ) + list(_undefined_bookmark_issues(html))
+        + f", peak {cache.peak_bytes / 2 ** 20:.1f}MB"
+    )
+
+
+# upper bounds, in seconds, of the buckets of the request latency histograms
+_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+_PROFILE_SLOWEST_URIS = 20
+
+
+def _latency_bucket_name(bucket: float) -> str:
+    if bucket == float("inf"):
+        return f">{_LATENCY_BUCKETS[-2]}s"
+    return f"<={bucket}s"
+
+
+def _latency_histogram(seconds: Iterable[float]) -> Dict[str, int]:
+    histogram = {_latency_bucket_name(bucket): 0 for bucket in _LATENCY_BUCKETS}
+    for value in seconds:
+        bucket = next(bucket for bucket in _LATENCY_BUCKETS if value <= bucket)
+        histogram[_latency_bucket_name(bucket)] += 1
+    return histogram
+
+
+def _cache_report(stats: CacheStats) -> Dict[str, Any]:
+    lookups = stats.hits + stats.misses
+    return {
+        **asdict(stats),
+        "hit_rate": stats.hits / lookups if lookups else None,
+    }
+
+
+def _profile_report(
+    profile: RunProfile, wall_seconds: float, cpu_seconds: float
+) -> Dict[str, Any]:
+    phases: Dict[str, PhaseTime] = defaultdict(PhaseTime)
+    for file_phases in profile.file_phases.values():
+        for phase, phase_time in file_phases.items():
+            total = phases[phase]
+            total.wall_seconds += phase_time.wall_seconds
+            if phase_time.cpu_seconds is not None:
+                total.cpu_seconds = (total.cpu_seconds or 0.0) + phase_time.cpu_seconds
+    slowest_uris = sorted(profile.uri_seconds.items(), key=lambda item: -item[1])
+    caches = {
+        **profile.caches,
+        # of the main process only, each rendering process has its own
+        **{f"memory/{name}": stats for name, stats in _MEMORY_CACHE.stats.items()},
+    }
+    return {
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,  # of the main process
+        "phases": {phase: asdict(total) for phase, total in sorted(phases.items())},
+        "files": {
+            path: {
+                phase: asdict(phase_time)
+                for phase, phase_time in sorted(file_phases.items())
+            }
+            for path, file_phases in sorted(profile.file_phases.items())
+        },
+        "slowest_uris": [
+            {"uri": uri, "seconds": seconds}
+            for uri, seconds in slowest_uris[:_PROFILE_SLOWEST_URIS]
+        ],
+        "hosts": {
+            host: {
+                "requests": len(seconds),
+                "seconds": sum(seconds),
+                "histogram": _latency_histogram(seconds),
+            }
+            for host, seconds in sorted(profile.host_request_seconds.items())
+        },
+        "caches": {
+            name: _cache_report(stats) for name, stats in sorted(caches.items())
+        },
+    }
 
 
 def _print_issue(tagged_issue: TaggedIssue) -> None:
@@ -301,27 +1578,153 @@ def _print_issues(tagged_issues: Sequence[TaggedIssue]):
     )
 
 
-@lru_cache
+def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+    # a saved file has a new modification time or size, also in the renderers
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@_MEMORY_CACHE.memoize(
+    size_of=lambda text, path: sys.getsizeof(text), version_of=_file_version
+)
 def _read_text(path: Path):
     return path.read_text(encoding="utf-8")
 
 
+_MARKDOWN_OPTIONS = dict(
+    extensions=["toc"],  # need toc so headers will generate ids
+    extension_configs={
+        # we need this for unicode titles
+        "toc": {"slugify": slugs.slugify(case="lower", percent_encode=False)}
+    },
+)
+
+
 def _render_markdown_to_html(markdown_text: str) -> HtmlText:
-    return HtmlText(
-        markdown(
-            markdown_text,
-            extensions=["toc"],  # need toc so headers will generate ids
-            extension_configs={
-                # we need this for unicode titles
-                "toc": {"slugify": slugs.slugify(case="lower", percent_encode=False)}
-            },
-        )
+    return HtmlText(markdown(markdown_text, **_MARKDOWN_OPTIONS))
+
+
+# links, autolinks and html tags all start with one of these
+_LINK_START_CHARS = ("[", "<")
+_HEADER_TAGS = {f"h{level}" for level in range(1, 7)}
+
+
+@lru_cache
+def _markdown_parser() -> Markdown:
+    return Markdown(**_MARKDOWN_OPTIONS)
+
+
+def _may_hold_links(text: Optional[str]) -> bool:
+    return text is not None and any(char in text for char in _LINK_START_CHARS)
+
+
+_CLOSING_PROBE_TAG = "verify-closing-probe"
+
+
+class _RawHtmlExtractor(_LinksAndIdsExtractor):
+    """
+    Also tells whether a tag fed after the html is still parsed as a tag, which
+    it is not if the html leaves a comment, a tag or a script or style element
+    open.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.is_closed = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == _CLOSING_PROBE_TAG:
+            self.is_closed = True
+        else:
+            super().handle_starttag(tag, attrs)
+
+
+def _is_inert_raw_html(raw_html: str) -> bool:
+    """
+    :return: whether the raw html holds neither links nor ids, and leaves no
+        element or comment open, which would swallow the markdown after it
+    """
+    extractor = _RawHtmlExtractor()
+    extractor.feed(f"{raw_html}<{_CLOSING_PROBE_TAG}>")
+    return extractor.is_closed and not extractor.uris and not extractor.ids
+
+
+def _markdown_links_and_ids(
+    markdown_text: str,
+) -> Optional[Tuple[Tuple[Uri, ...], FrozenSet[str], bool]]:
+    """
+    Reads the links and ids of a markdown doc from the tree python-markdown
+    parses, instead of from the html it renders. The inline patterns only run
+    on the headings (for their ids) and on the text that may hold a link, and
+    no html is parsed.
+
+    :return: the uris, the ids and whether the links are skipped, as rendering
+        would tell, or None for the docs that must be rendered: with raw html
+        holding links or ids, or with undefined bookmarks
+    """
+    if not markdown_text.strip():
+        return (), frozenset(), False  # rendered to nothing
+    md = _markdown_parser()
+    md.reset()
+    lines = markdown_text.split("\n")
+    for preprocessor in md.preprocessors:
+        lines = preprocessor.run(lines)
+    root = md.parser.parseDocument(lines).getroot()
+    for element in root.iter():
+        if element.tag not in _HEADER_TAGS and not _may_hold_links(element.text):
+            element.text = None if element.text is None else AtomicString(element.text)
+        if not _may_hold_links(element.tail):
+            element.tail = None if element.tail is None else AtomicString(element.tail)
+    for treeprocessor in md.treeprocessors:
+        root = treeprocessor.run(root) or root
+
+    raw_html = [str(block) for block in md.htmlStash.rawHtmlBlocks]
+    if not all(_is_inert_raw_html(block) for block in raw_html):
+        return None
+    skip_types = {
+        match.group("type")
+        for block in raw_html
+        for match in _SKIP_TEXT_PATTERN.finditer(block)
+    }
+    if len(skip_types) > 1:
+        return None  # which one comes first in the html is up to the renderer
+    texts = raw_html + [
+        text
+        for element in root.iter()
+        for text in (element.text, element.tail, *element.attrib.values())
+        if text
+    ]
+    if any("][" in text for text in texts):
+        # the text left out of the inline patterns has no "[" (nor newlines
+        # that rendering would add), so the bookmark check finds the same
+        # matches, on the same lines, in the html of this tree
+        html = md.serializer(root)
+        for postprocessor in md.postprocessors:
+            html = postprocessor.run(html)
+        if _MARKDOWN_BOOKMARK_PATTERN.search(html):
+            return None
+    hrefs = (
+        # as written by the postprocessors and read back from the html
+        unescape(anchor.get("href").replace(AMP_SUBSTITUTE, "&"))
+        for anchor in root.iter("a")
+        if anchor.get("href")
     )
+    uris = tuple(Uri(href.strip()) for href in hrefs if href)
+    ids = frozenset(
+        unescape(element.get("id")) for element in root.iter() if "id" in element.attrib
+    )
+    return uris, ids, skip_types == {"links"}
+
 
 def remove_angles_in_headers(text):
     return '\n'.join(line.replace('<', '').replace('>', '') if line.strip().startswith('#') else line for line in text.split('\n'))
 
-@lru_cache
+@_MEMORY_CACHE.memoize(
+    size_of=lambda html, path: sys.getsizeof(html), version_of=_file_version
+)
 def read_html_text(path: Path) -> HtmlText:
     if path.name.endswith(".md"):
         return _render_markdown_to_html(remove_angles_in_headers(_read_text(path)))
@@ -329,6 +1732,43 @@ def read_html_text(path: Path) -> HtmlText:
         return HtmlText(_read_text(path))  # assuming given file is already html
 
 
+def _render_doc(
+    path: Path, use_beautifulsoup: bool = False, use_fast_path: bool = True
+) -> RenderedDoc:
+    """
+    Runs in a rendering process, see _rendered_doc.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if use_fast_path and path.name.endswith(".md"):
+        links_and_ids = _markdown_links_and_ids(
+            remove_angles_in_headers(_read_text(path))
+        )
+        if links_and_ids is not None:
+            uris, ids, skips_links = links_and_ids
+            return RenderedDoc(
+                ids=ids,
+                uris=uris,
+                undefined_bookmark_issues=(),
+                skips_links=skips_links,
+                render_seconds=(
+                    time.perf_counter() - wall_start,
+                    time.process_time() - cpu_start,
+                ),
+            )
+    html = read_html_text(path)
+    uris, ids = _extract_uris_and_ids(html, use_beautifulsoup)
+    return RenderedDoc(
+        ids=ids,
+        uris=uris,
+        undefined_bookmark_issues=tuple(_undefined_bookmark_issues(html)),
+        skips_links=_should_skip_html_issues(html),
+        render_seconds=(
+            time.perf_counter() - wall_start,
+            time.process_time() - cpu_start,
+        ),
+    )
+
+
 def _is_english_file(path: Path) -> bool:
     return not bool(_LANGUAGES_DIR_PATTERN.search(str(path.absolute().as_posix())))
 
@@ -352,29 +1792,31 @@ def _is_root_languages_dir(path: Path) -> bool:
     return path.absolute() == _ROOT_LANGUAGES_DIR.absolute()
 
 
-def _translations_directory(path: Path) -> Optional[TranslationsDir]:
+def _translations_directory(
+    path: Path, tree: TreeSnapshot
+) -> Optional[TranslationsDir]:
     if not _is_english_file(path):
         return None  # non english files do not have a translation directory
     languages_dir = path.parent / _LANGUAGES_DIR_NAME
-    if languages_dir.exists() and not _is_root_languages_dir(languages_dir):
+    if tree.exists(languages_dir) and not _is_root_languages_dir(languages_dir):
         return TranslationsDir(ExistingPath(languages_dir))  # found dir, end recursion
     if path.parent == path:  # reached end of path, end recursion
         return None
-    return _translations_directory(path.parent)
+    return _translations_directory(path.parent, tree)
 
 
 def _relative_to_absolute(a: Path, b: Path) -> Path:
     return a.absolute().relative_to(b.absolute())
 
 
-def _expected_language_codes(my_dir: TranslationsDir):
-    return [path.name for path in my_dir.glob("*") if path.is_dir()]
+def _expected_language_codes(my_dir: TranslationsDir, tree: TreeSnapshot):
+    return [path.name for path in tree.subdirectories(my_dir)]
 
 
-def _expected_translation_files(path: Path) -> Sequence[Path]:
+def _expected_translation_files(path: Path, tree: TreeSnapshot) -> Sequence[Path]:
     if not _is_english_file(path):
         return []  # non english files are not expected to be translated
-    translations_directory = _translations_directory(path)
+    translations_directory = _translations_directory(path, tree)
     if translations_directory is None:
         return []  # no translations dir - no translation is expected
 
@@ -382,7 +1824,7 @@ def _expected_translation_files(path: Path) -> Sequence[Path]:
     project_dir = translations_directory.parent
     return [
         translations_directory / lang_code / _relative_to_absolute(path, project_dir)
-        for lang_code in _expected_language_codes(translations_directory)
+        for lang_code in _expected_language_codes(translations_directory, tree)
     ]
 
 
@@ -390,15 +1832,16 @@ def _should_skip_translation_issues(path: Path) -> bool:
     return _skip_type(_read_text(path)) == "translation"
 
 
-def _translation_issues(path: Path) -> Iterable[Issue]:
+def _translation_issues(path: Path, tree: TreeSnapshot) -> Iterable[Issue]:
     if _should_skip_translation_issues(path):
         return []
     if not _is_english_file(path):
         return []
-    for translation_file in _expected_translation_files(path):
-        if not translation_file.exists():
+    for translation_file in _expected_translation_files(path, tree):
+        if not tree.exists(translation_file):
             yield Issue(
-                f"Translation file {translation_file.as_posix()} does not exist"
+                f"Translation file {translation_file.as_posix()} does not exist",
+                rule_id="missing-translation",
             )
 
 
@@ -406,12 +1849,16 @@ def _tag_issues(issues: Iterable[Issue], tag: Path) -> Sequence[TaggedIssue]:
     return [(tag, issue) for issue in issues]
 
 
-def _existing_paths(paths: Iterable[Path]) -> Sequence[ExistingPath]:
-    return [ExistingPath(path) for path in paths if path.exists()]
+def _existing_paths(
+    paths: Iterable[Path], tree: TreeSnapshot
+) -> Sequence[ExistingPath]:
+    return [ExistingPath(path) for path in paths if tree.exists(path)]
 
 
-def _files_that_should_have_matching_titles(path: Path) -> Iterable[Path]:
-    yield from _expected_translation_files(path)
+def _files_that_should_have_matching_titles(
+    path: Path, tree: TreeSnapshot
+) -> Iterable[Path]:
+    yield from _expected_translation_files(path, tree)
     if path.name == "spec.md":
         yield path.parent / "README.md"
 
@@ -423,7 +1870,9 @@ def _file_title(path: ExistingPath) -> str:
 def _non_matching_titles_issue(path_a: ExistingPath, path_b: ExistingPath) -> Issue:
     return Issue(
         f"title ({repr(_file_title(path_a))}) does not match "
-        f"the title of {path_b.as_posix()} ({repr(_file_title(path_b))})"
+        f"the title of {path_b.as_posix()} ({repr(_file_title(path_b))})",
+        rule_id="title-mismatch",
+        line=1,
     )
 
 
@@ -434,48 +1883,811 @@ def _titles_match(title_a: str, title_b: str) -> bool:
         return True  # Translations probably have specific titles
 
 
-def _title_issues(path: ExistingPath) -> Iterable[Issue]:
-    for other_path in _existing_paths(_files_that_should_have_matching_titles(path)):
+def _title_issues(path: ExistingPath, tree: TreeSnapshot) -> Iterable[Issue]:
+    for other_path in _existing_paths(
+        _files_that_should_have_matching_titles(path, tree), tree
+    ):
         if not _titles_match(_file_title(path), _file_title(other_path)):
             yield _non_matching_titles_issue(path, other_path)
 
 
-async def _file_issues(path: ExistingPath, settings: Settings) -> Sequence[TaggedIssue]:
+# any change to the checks invalidates the cached results of the local checks
+_RULES_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+@lru_cache
+def _content_hash(path: Path) -> Optional[str]:
+    """
+    :return: None for missing paths, which is a state worth keying on as well
+    """
+    if path.is_dir():
+        return "directory"
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _relative_doc_path(path: Path, tree: TreeSnapshot) -> Optional[PurePosixPath]:
+    if tree.root is None:
+        return None
+    return PurePosixPath(Path(os.path.relpath(path, tree.root)).as_posix())
+
+
+def _local_dependencies(
+    path: Path, uris: Iterable[Uri], tree: TreeSnapshot
+) -> Set[Path]:
+    """
+    Every path, other than the document itself, the local checks look at.
+    """
+    linked_paths = {
+        target[0]
+        for target in (_local_uri_target(uri, path) for uri in uris if _is_local_uri(uri))
+        if target is not None
+    }
+    # also covers the expected translation files
+    return linked_paths | set(_files_that_should_have_matching_titles(path, tree))
+
+
+def _dependencies_hash(paths: Iterable[Path]) -> str:
+    states = sorted(
+        f"{os.path.normpath(path)}\0{_content_hash(path)}" for path in paths
+    )
+    return hashlib.sha256("\n".join(states).encode("utf-8")).hexdigest()
+
+
+def _is_valid_file_result(
+    result: CachedFileResult, path: Path, tree: TreeSnapshot
+) -> bool:
+    return (
+        result.content_hash == _content_hash(path)
+        and result.rules_version == _RULES_VERSION
+        and result.dependencies_hash
+        == _dependencies_hash(_local_dependencies(path, result.uris, tree))
+    )
+
+
+def _replayable_file_results(settings: Settings) -> Optional[FileResultCache]:
+    # the cached results were found the default way, a cross-check of another
+    # way must extract the links and ids of every doc again
+    if settings.use_beautifulsoup or not settings.use_markdown_fast_path:
+        return None
+    return settings.file_result_cache
+
+
+async def _local_file_result(path: ExistingPath, settings: Settings) -> CachedFileResult:
+    cache = _replayable_file_results(settings)
+    cached = None if cache is None else cache.get(path.as_posix())
+    profile = settings.profile
+    if cached is not None and _is_valid_file_result(cached, path, settings.tree):
+        if profile is not None:
+            profile.caches["file-results"].hits += 1
+        return cached  # replayed without rendering or checking anything
+    if profile is not None and cache is not None:
+        profile.caches["file-results"].misses += 1
+
+    doc = await _rendered_doc(path, settings)
+    if profile is not None:
+        profile.file_phases[path.as_posix()]["render"] = PhaseTime(*doc.render_seconds)
+    with _timed_phase(profile, path, "local-links", measures_cpu=False):
+        link_issues = list(await _local_link_issues(path, settings))
+    with _timed_phase(profile, path, "text-rules"):
+        relative_path = _relative_doc_path(path, settings.tree)
+        text_issues = list(_plain_text_issues(_read_text(path), relative_path))
+    with _timed_phase(profile, path, "translations"):
+        translation_issues = list(_translation_issues(path, settings.tree)) + list(
+            _title_issues(path, settings.tree)
+        )
+    result = CachedFileResult(
+        content_hash=_content_hash(path),
+        rules_version=_RULES_VERSION,
+        dependencies_hash=_dependencies_hash(
+            _local_dependencies(path, doc.uris, settings.tree)
+        ),
+        uris=list(doc.uris),
+        skips_links=doc.skips_links,
+        issues=link_issues + text_issues + translation_issues,
+    )
+    if cache is not None:
+        cache[path.as_posix()] = result
+    return result
+
+
+def _stable_hash(text: str) -> int:
+    # unlike hash(), the same on every node and in every process
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _shard_docs(
+    paths: Iterable[ExistingPath], shard: Shard, tree: TreeSnapshot
+) -> Set[ExistingPath]:
+    """
+    Deals the docs, largest first, to the least loaded shard so every shard has
+    about as many bytes to check. Ties are broken by a stable hash of the path
+    relative to the root, so every node computes the same partition.
+    """
+
+    def relative_name(path: Path) -> str:
+        return Path(os.path.relpath(path, tree.root or ".")).as_posix()
+
+    def size(path: Path) -> int:
+        info = tree.info(path)
+        return 0 if info is None else info.size
+
+    loads = [0] * shard.count
+    shard_paths = set()
+    for path in sorted(
+        paths, key=lambda path: (-size(path), _stable_hash(relative_name(path)))
+    ):
+        index = loads.index(min(loads))
+        loads[index] += size(path)
+        if index == shard.index:
+            shard_paths.add(path)
+    return shard_paths
+
+
+def _is_probed_by(uri: Uri, shard: Optional[Shard]) -> bool:
+    """
+    Http uris are dealt to shards on their own, so a uri linked from the docs of
+    several shards is still probed once.
+    """
+    if shard is None or not _is_http_uri(uri):
+        return True
+    return _stable_hash(_normalized_uri(HttpUri(uri))) % shard.count == shard.index
+
+
+async def _file_issues(
+    path: ExistingPath, settings: Settings, checks_locally: bool = True
+) -> Sequence[TaggedIssue]:
+    """
+    :param checks_locally: False to only probe the http links of the doc
+    """
     # print(f"> {path}")
-    return _tag_issues(
-        list(await _html_issues(path, settings))
-        + list(_plain_text_issues(_read_text(path)))
-        + list(_translation_issues(path))
-        + list(_title_issues(path)),
-        tag=path,
+    if checks_locally:
+        result = await _local_file_result(path, settings)
+        uris, skips_links, local_issues = result.uris, result.skips_links, result.issues
+    else:
+        uris, skips_links = await _doc_links(path, settings)
+        local_issues = []
+    probed_uris = [uri for uri in uris if _is_probed_by(uri, settings.shard)]
+    with _timed_phase(settings.profile, path, "http", measures_cpu=False):
+        http_issues = (
+            [] if skips_links else await _http_link_issues(probed_uris, settings)
+        )
+    tagged_issues = _tag_issues(list(http_issues) + local_issues, tag=path)
+    for writer in settings.issue_writers:
+        writer.write(tagged_issues)
+    return tagged_issues
+
+
+def _absolute(path: Path) -> Path:
+    # resolving symlinks too, as git reports paths under the resolved top level
+    return path.resolve()
+
+
+def _changed_paths(directory: Path, ref: str) -> Set[Path]:
+    """
+    :return: the absolute paths that were changed, added or deleted since the
+        given git ref, including uncommitted and untracked changes
+    """
+
+    def git(*args: str) -> List[str]:
+        return subprocess.run(
+            ["git", *args],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+
+    top_level = Path(git("rev-parse", "--show-toplevel")[0])
+    return {
+        _absolute(top_level / name)
+        # without renames, which would only list the new name of a renamed doc
+        for name in git("diff", "--name-only", "--no-renames", ref, "--")
+        + git("ls-files", "--others", "--exclude-standard", "--full-name")
+    }
+
+
+async def _doc_links(
+    path: ExistingPath, settings: Settings
+) -> Tuple[Sequence[Uri], bool]:
+    """
+    :return: the uris of the doc and whether its links are skipped
+    """
+    cache = settings.file_result_cache
+    cached = None if cache is None else cache.get(path.as_posix())
+    if cached is not None and cached.content_hash == _content_hash(path):
+        return cached.uris, cached.skips_links
+    doc = await _rendered_doc(path, settings)
+    return doc.uris, doc.skips_links
+
+
+async def _reverse_link_graph(
+    paths: Sequence[ExistingPath], settings: Settings
+) -> Dict[Path, Set[Path]]:
+    all_links = await asyncio.gather(*[_doc_links(path, settings) for path in paths])
+    graph = defaultdict(set)
+    for path, (uris, _) in zip(paths, all_links):
+        for dependency in _local_dependencies(path, uris, settings.tree):
+            graph[_absolute(dependency)].add(_absolute(path))
+    return dict(graph)
+
+
+def _affected_docs(
+    paths: Sequence[ExistingPath],
+    changed_paths: Set[Path],
+    link_graph: Dict[Path, Set[Path]],
+) -> List[ExistingPath]:
+    """
+    The changed docs and every doc whose local checks look into a changed path,
+    e.g. through a link to a heading that was renamed.
+    """
+    affected = set(changed_paths)
+    for changed_path in changed_paths:
+        affected |= link_graph.get(changed_path, set())
+    return [path for path in paths if _absolute(path) in affected]
+
+
+@contextmanager
+def _render_executor(settings: Settings) -> Iterator[Optional[Executor]]:
+    if settings.render_processes <= 1:
+        yield None
+    else:
+        with ProcessPoolExecutor(
+            settings.render_processes,
+            initializer=_set_memory_cache_budget,
+            initargs=(settings.memory_cache_max_bytes,),
+        ) as executor:
+            yield executor
+
+
+@asynccontextmanager
+async def _run_scope(settings: Settings) -> AsyncIterator[Settings]:
+    """
+    Opens the resources shared by the whole run: the http client and the
+    markdown rendering processes.
+    """
+    _set_memory_cache_budget(settings.memory_cache_max_bytes)
+    async with _pooled_http_session(settings) as session:
+        with _render_executor(settings) as executor:
+            yield replace(settings, http_session=session, render_executor=executor)
+
+
+def _english_counterpart(path: Path) -> Path:
+    """
+    :return: the english doc a translation is translated from, a path for the
+        english docs themselves
+    """
+    parts = path.parts
+    if _LANGUAGES_DIR_NAME not in parts[:-2]:
+        return path
+    languages_index = len(parts) - 1 - parts[::-1].index(_LANGUAGES_DIR_NAME, 2)
+    return Path(*parts[:languages_index], *parts[languages_index + 2 :])
+
+
+def _locality_order(paths: Iterable[ExistingPath]) -> List[ExistingPath]:
+    """
+    Verifies every doc next to its translations, which have the same links and
+    read each other's titles, so a bounded memory cache still finds them.
+    """
+    return sorted(paths, key=lambda path: (_english_counterpart(path), path))
+
+
+async def _bounded_gather(
+    coroutines: Sequence[Awaitable[T]], limit: Optional[int]
+) -> List[T]:
+    if limit is None:
+        return await tqdm.gather(*coroutines, unit="files")
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coroutine: Awaitable[T]) -> T:
+        async with semaphore:
+            return await coroutine
+
+    return await tqdm.gather(
+        *[bounded(coroutine) for coroutine in coroutines], unit="files"
     )
 
 
 async def _directory_issues(
     directory: Path, settings: Settings
 ) -> Iterable[TaggedIssue]:
+    if not settings.tree.covers(directory):
+        settings = replace(settings, tree=TreeSnapshot(directory))
+    if settings.http_session is None:
+        async with _run_scope(settings) as scoped_settings:
+            return await _directory_issues(directory, scoped_settings)
+    paths = _locality_order(
+        path
+        for path in _all_docs(settings.tree, settings.excluded_paths)
+        if os.path.abspath(path).startswith(os.path.abspath(directory) + os.sep)
+    )
+    if settings.changed_paths is not None:
+        # rebuilt from the links of every doc, so the links removed since the
+        # last run (in --watch) are dropped
+        link_graph = await _reverse_link_graph(paths, settings)
+        settings.link_graph.clear()
+        settings.link_graph.update(link_graph)
+        affected_paths = _affected_docs(
+            paths, settings.changed_paths, settings.link_graph
+        )
+        print(f"Verifying {len(affected_paths)} of {len(paths)} docs affected by changes")
+        paths = affected_paths
+    if settings.shard is None:
+        local_paths = set(paths)
+    else:
+        local_paths = _shard_docs(paths, settings.shard, settings.tree)
+        print(f"Shard {settings.shard} checks {len(local_paths)} of {len(paths)} docs")
     return _flatten(
-        await tqdm.gather(
-            *[
-                _file_issues(path, settings)
-                for path in sorted(_all_docs(directory, settings.excluded_paths))
+        await _bounded_gather(
+            [
+                _file_issues(path, settings, checks_locally=path in local_paths)
+                for path in paths
             ],
-            unit="files",
+            settings.max_files_in_flight,
+        )
+    )
+
+
+def _positive_int_argument(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise ArgumentTypeError(f"{text!r} is not an integer")
+    if value < 1:
+        raise ArgumentTypeError(f"{value} is not at least 1")
+    return value
+
+
+def _positive_seconds_argument(text: str) -> float:
+    try:
+        value = float(text)
+    except ValueError:
+        raise ArgumentTypeError(f"{text!r} is not a number of seconds")
+    if not value > 0:
+        raise ArgumentTypeError(f"{value} is not more than 0 seconds")
+    return value
+
+
+def _shard_argument(text: str) -> Shard:
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ArgumentTypeError(f"{text!r} is not of the form INDEX/COUNT")
+    if not 1 <= index <= count:
+        raise ArgumentTypeError(f"shard index {index} is not between 1 and {count}")
+    return Shard(index=index - 1, count=count)
+
+
+def _save_partial_result(
+    path: Path, shard: Shard, tagged_issues: Sequence[TaggedIssue]
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "shard": [shard.index, shard.count],
+                "issues": [
+                    [tag.as_posix(), issue.as_dict()] for tag, issue in tagged_issues
+                ],
+            },
+            indent=1,
+        ),
+        encoding="utf-8",
+    )
+
+
+def _sorted_issues(tagged_issues: Iterable[TaggedIssue]) -> List[TaggedIssue]:
+    """
+    Orders the issues of docs verified apart like the issues of a full run, in
+    the order of _locality_order.
+    """
+    # sorting is stable: the issues of a doc keep the order they were found in
+    return sorted(
+        tagged_issues, key=lambda tagged: (_english_counterpart(tagged[0]), tagged[0])
+    )
+
+
+def _merged_partial_results(paths: Iterable[Path]) -> List[TaggedIssue]:
+    """
+    :raise ValueError: unless the partial results are of every shard of a run
+    """
+    shards = set()
+    tagged_issues = []
+    for path in paths:
+        partial_result = json.loads(path.read_text(encoding="utf-8"))
+        shards.add(Shard(*partial_result["shard"]))
+        tagged_issues += [
+            (Path(tag), Issue(**issue)) for tag, issue in partial_result["issues"]
+        ]
+    counts = {shard.count for shard in shards}
+    if len(counts) != 1 or len(shards) != counts.pop():
+        raise ValueError(
+            "expected the results of every shard of one run, got shards "
+            + ", ".join(sorted(map(str, shards)))
+        )
+    return _sorted_issues(tagged_issues)
+
+
+def _is_cache_file(path: Path) -> bool:
+    return bool(_CACHE_DIR_NAMES.intersection(path.parts))
+
+
+def _cache_files(tree: TreeSnapshot) -> Set[Path]:
+    return {path for path in tree.files() if _is_cache_file(path)}
+
+
+def _excluded_paths(tree: TreeSnapshot) -> Set[Path]:
+    return tree.files_under(_FAKE_DOCS_DIR) | _cache_files(tree)
+
+
+def _save_run_caches(root: Path, settings: Settings) -> None:
+    cache_dir = root / _VERIFY_CACHE_DIR_NAME
+    if settings.link_cache is not None:
+        _save_link_cache(cache_dir / _LINK_CACHE_FILE_NAME, settings.link_cache)
+    if settings.file_result_cache is not None:
+        # the results of docs deleted or renamed since are never valid again,
+        # those of docs left out of this run (e.g. by --shard) still are
+        docs = {
+            path.as_posix()
+            for path in _all_docs(settings.tree, settings.excluded_paths)
+        }
+        for key in settings.file_result_cache.keys() - docs:
+            del settings.file_result_cache[key]
+        _save_cache(
+            cache_dir / _FILE_RESULT_CACHE_FILE_NAME, settings.file_result_cache
         )
+
+
+def _changed_files(old_tree: TreeSnapshot, new_tree: TreeSnapshot) -> Set[Path]:
+    """
+    :return: the absolute paths of the files added, deleted, or saved between
+        the snapshots, other than the cache files, which --watch itself saves
+    """
+
+    def file_infos(tree: TreeSnapshot) -> Dict[str, PathInfo]:
+        return {
+            os.path.abspath(path): tree.info(path)
+            for path in tree.files()
+            if not _is_cache_file(path)
+        }
+
+    old_infos, new_infos = file_infos(old_tree), file_infos(new_tree)
+    return {
+        _absolute(Path(path))
+        for path in old_infos.keys() | new_infos.keys()
+        if old_infos.get(path) != new_infos.get(path)
+    }
+
+
+def _forget_changed_files(settings: Settings, changed_files: Set[Path]) -> None:
+    """
+    Drops the state of the run computed from files that changed since, so a
+    long watch does not pile up the texts of every saved version. The local
+    results are keyed by content hash, they do not need to be dropped.
+    """
+    for key in [key for key in settings.renders if _absolute(key) in changed_files]:
+        del settings.renders[key]
+    for memoized in (_read_text, read_html_text):
+        memoized.forget(lambda path: _absolute(path) in changed_files)
+    _content_hash.cache_clear()
+
+
+async def _reverified_changes(
+    root: Path, settings: Settings, tagged_issues: Sequence[TaggedIssue]
+) -> Tuple[Settings, Optional[List[TaggedIssue]]]:
+    """
+    :param tagged_issues: the issues of every doc before the changes
+    :return: the settings of the scanned tree, and the issues of every doc
+        after verifying the changed docs and the docs looking into them again,
+        None if nothing changed
+    """
+    tree = TreeSnapshot(root)
+    changed_files = _changed_files(settings.tree, tree)
+    if not changed_files:
+        return settings, None
+    _forget_changed_files(settings, changed_files)
+    settings = replace(
+        settings,
+        tree=tree,
+        excluded_paths=_excluded_paths(tree),
+        changed_paths=changed_files,
     )
+    reverified_issues = list(await _directory_issues(root, settings))
+    # the link graph now is the one the verified docs were affected through
+    reverified_docs = changed_files.union(
+        *(settings.link_graph.get(path, set()) for path in changed_files)
+    )
+    kept_issues = [
+        (tag, issue)
+        for tag, issue in tagged_issues
+        if _absolute(tag) not in reverified_docs
+    ]
+    return settings, _sorted_issues(kept_issues + reverified_issues)
+
+
+def _print_watched_issues(tagged_issues: Sequence[TaggedIssue]) -> None:
+    if tagged_issues:
+        _print_issues(tagged_issues)
+    else:
+        print("Spec verification succeeded")
 
 
-def _cache_files(path: Path) -> Set[Path]:
-    return set(path.rglob("**/.pytest_cache/**/*"))
+async def _watch(root: Path, settings: Settings, poll_seconds: float) -> None:
+    """
+    Verifies the docs, then again every time files are saved, keeping the
+    rendered docs, their ids and the probed links of the run in memory.
+    """
+    saves_caches = settings.file_result_cache is not None
+    if not saves_caches:
+        settings = replace(settings, file_result_cache={})  # kept in memory only
+    async with _run_scope(settings) as settings:
+        issues = list(await _directory_issues(root, settings))
+        _print_watched_issues(issues)
+        if saves_caches:
+            _save_run_caches(root, settings)
+        print(f"Watching {root} for changes, stop with Ctrl+C")
+        while True:
+            await asyncio.sleep(poll_seconds)
+            start_time = time.perf_counter()
+            settings, reverified_issues = await _reverified_changes(
+                root, settings, issues
+            )
+            if reverified_issues is None:
+                continue
+            issues = reverified_issues
+            _print_watched_issues(issues)
+            print(f"Verified the changes in {time.perf_counter() - start_time:.3f}s")
+            if saves_caches:
+                _save_run_caches(root, settings)
 
 
 async def main():
     parser = ArgumentParser()
     parser.add_argument("root", default=".", nargs="?")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="check everything from scratch, ignoring and not updating the caches",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=int,
+        default=Settings.link_cache_max_age_seconds,
+        metavar="SECONDS",
+        help="cached link results younger than this are not probed again",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=_positive_int_argument,
+        default=Settings.http_max_concurrency,
+        help="maximal number of external links probed at the same time",
+    )
+    parser.add_argument(
+        "--max-per-host",
+        type=_positive_int_argument,
+        default=Settings.http_max_per_host,
+        help="maximal number of external links of one host probed at the same time",
+    )
+    parser.add_argument(
+        "--max-backoff",
+        type=float,
+        default=Settings.http_backoff_max_seconds,
+        metavar="SECONDS",
+        help="longest wait before probing a throttled or failing link again",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="only verify docs changed since the given git ref, and the docs "
+        "linking into them",
+    )
+    parser.add_argument(
+        "--beautifulsoup",
+        action="store_true",
+        help="extract links and ids with BeautifulSoup, to compare with the "
+        "default streaming parser",
+    )
+    parser.add_argument(
+        "--full-render",
+        action="store_true",
+        help="render every markdown doc to html, to compare with the default "
+        "reading of links and ids from the markdown",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        metavar="MEGABYTES",
+        help="bound the memory held by cached texts and trees, and verify a "
+        "few docs at a time",
+    )
+    parser.add_argument(
+        "--shard",
+        type=_shard_argument,
+        metavar="INDEX/COUNT",
+        help="only verify a part of the docs and links, e.g. on one of several CI "
+        "nodes, and save the issues for --merge",
+    )
+    parser.add_argument(
+        "--partial-result",
+        type=Path,
+        metavar="PATH",
+        help="where --shard saves its issues, by default in "
+        f"{_VERIFY_CACHE_DIR_NAME}/ under the root",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        type=Path,
+        metavar="PARTIAL_RESULT",
+        help="report the issues of the partial results of every shard of a run, "
+        "without verifying anything",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="PATH",
+        help="save where the time of the run goes, per doc and phase, per uri and "
+        "host, and the hit rates of the caches, as JSON",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=Path,
+        metavar="PATH",
+        help="save a cProfile dump of the main process, e.g. for snakeviz",
+    )
+    parser.add_argument(
+        "--jsonl",
+        type=Path,
+        metavar="PATH",
+        help="stream the issues of every doc, as soon as it is verified, as JSON "
+        "lines with the path, line, column, rule and message of each issue",
+    )
+    parser.add_argument(
+        "--sarif",
+        type=Path,
+        metavar="PATH",
+        help="stream the issues as a SARIF log, complete once the run is over",
+    )
+    cassette_arguments = parser.add_mutually_exclusive_group()
+    cassette_arguments.add_argument(
+        "--record",
+        type=Path,
+        metavar="CASSETTE",
+        help="probe every external link and record what was observed, to replay "
+        "the run without network access",
+    )
+    cassette_arguments.add_argument(
+        "--replay",
+        type=Path,
+        metavar="CASSETTE",
+        help="answer the external link checks from a recorded cassette, without "
+        "network access",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running, and verify the saved docs and the docs looking into "
+        "them again as soon as they are saved",
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=_positive_seconds_argument,
+        default=0.5,
+        metavar="SECONDS",
+        help="how often --watch looks for saved files",
+    )
     args = parser.parse_args()
+    if args.watch:
+        # the outputs of these are written once the run is over, which a
+        # watch never is
+        unsupported_options = [
+            option
+            for option, value in (
+                ("--merge", args.merge),
+                ("--shard", args.shard),
+                ("--record", args.record),
+                ("--profile", args.profile),
+                ("--cprofile", args.cprofile),
+                ("--jsonl", args.jsonl),
+                ("--sarif", args.sarif),
+            )
+            if value is not None
+        ]
+        if unsupported_options:
+            parser.error(
+                f"--watch cannot be combined with {', '.join(unsupported_options)}"
+            )
     root = Path(args.root)
-    settings = Settings(excluded_paths=_FAKE_DOCS | _cache_files(root))
+    if args.replay is not None and not args.replay.is_file():
+        parser.error(f"there is no cassette at {args.replay}")
+    cassette_path = args.record or args.replay
+    if args.merge is not None:
+        try:
+            issues = _merged_partial_results(args.merge)
+        except (OSError, ValueError, TypeError, KeyError) as error:
+            parser.error(f"cannot merge the partial results: {error}")
+        if issues:
+            _print_issues(issues)
+            exit(1)
+        print("Spec verification succeeded")
+        exit(0)
+    changed_paths = None
+    if args.changed_since is not None:
+        try:
+            changed_paths = _changed_paths(root, args.changed_since)
+        except (OSError, subprocess.CalledProcessError) as error:
+            parser.error(f"cannot list the changes since {args.changed_since}: {error}")
+    link_cache_path = root / _VERIFY_CACHE_DIR_NAME / _LINK_CACHE_FILE_NAME
+    file_result_cache_path = root / _VERIFY_CACHE_DIR_NAME / _FILE_RESULT_CACHE_FILE_NAME
+    tree = TreeSnapshot(root)
+    bounded_memory = args.cache_mb is not None
+    settings = Settings(
+        excluded_paths=_excluded_paths(tree),
+        tree=tree,
+        link_cache=None if args.no_cache else _load_link_cache(link_cache_path),
+        file_result_cache=(
+            None
+            if args.no_cache
+            else _load_cache(file_result_cache_path, CachedFileResult)
+        ),
+        link_cache_max_age_seconds=args.max_age,
+        http_max_concurrency=args.max_concurrency,
+        http_max_per_host=args.max_per_host,
+        http_backoff_max_seconds=args.max_backoff,
+        changed_paths=changed_paths,
+        use_beautifulsoup=args.beautifulsoup,
+        use_markdown_fast_path=not args.full_render,
+        memory_cache_max_bytes=args.cache_mb << 20 if bounded_memory else None,
+        max_files_in_flight=2 * Settings.render_processes if bounded_memory else None,
+        shard=args.shard,
+        profile=None if args.profile is None else RunProfile(),
+        cassette=(
+            None if cassette_path is None else _load_cache(cassette_path, RecordedProbe)
+        ),
+        records_cassette=args.record is not None,
+        issue_writers=[
+            writer_type(path)
+            for writer_type, path in (
+                (JsonLinesIssueWriter, args.jsonl),
+                (SarifIssueWriter, args.sarif),
+            )
+            if path is not None
+        ],
+    )
+    if args.watch:
+        await _watch(root, settings, args.poll_seconds)
+    profiler = None if args.cprofile is None else cProfile.Profile()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
     issues = list(await _directory_issues(root, settings))
+    for writer in settings.issue_writers:
+        writer.close()
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+    if settings.profile is not None:
+        report = _profile_report(
+            settings.profile,
+            wall_seconds=time.perf_counter() - wall_start,
+            cpu_seconds=time.process_time() - cpu_start,
+        )
+        args.profile.write_text(json.dumps(report, indent=1), encoding="utf-8")
+    if args.shard is not None:
+        partial_result_path = args.partial_result or (
+            root
+            / _VERIFY_CACHE_DIR_NAME
+            / f"shard-{args.shard.index + 1}-of-{args.shard.count}.json"
+        )
+        _save_partial_result(partial_result_path, args.shard, issues)
+        print(f"Saved the issues of shard {args.shard} to {partial_result_path}")
+    _print_pool_stats(settings.pool_stats)
+    _print_memory_cache_stats(_MEMORY_CACHE)
+    _save_run_caches(root, settings)
+    if settings.records_cassette:
+        _save_cache(args.record, settings.cassette)
     if issues:
         _print_issues(issues)
         exit(1)
@@ -487,4 +2699,7 @@ async def main():
 if __name__ == "__main__":
     # Need async because we perform alot of http requests.
     loop = asyncio.new_event_loop()
-    loop.run_until_complete(main())
+    try:
+        loop.run_until_complete(main())
+    except KeyboardInterrupt:
+        pass  # how --watch is stopped